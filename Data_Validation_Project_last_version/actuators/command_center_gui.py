@@ -2,14 +2,46 @@ import tkinter as tk
 from tkinter import scrolledtext, messagebox
 import paho.mqtt.client as mqtt
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import threading
 import time
+from collections import deque
 
 # --- Configuration ---
 API_BASE_URL = "http://localhost:8000/api"
 ACTUATOR_ID_TO_FIND = "smart_lamp"
 
+# Reused HTTP session so consecutive API calls share one keep-alive connection.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=Retry(total=2, backoff_factor=0.1)))
+HTTP_TIMEOUT = (2, 5) # (connect, read) seconds
+
+# paho's network loop is polled from Tk's event loop, so all callbacks run on the Tk thread
+MQTT_POLL_MS = 50
+# After the connection drops, reconnect attempts back off from the minimum,
+# doubling up to the maximum (paho's loop_forever() used to reconnect on its own)
+RECONNECT_MIN_DELAY_MS = 1000
+RECONNECT_MAX_DELAY_MS = 30000
+
+# --- Example Commands ---
+EXAMPLES = {
+    "Living Room ON (White)": {"command": "on", "room": "living_room"},
+    "Living Room OFF": {"command": "off", "room": "living_room"},
+    "Kitchen ON (Red)": {"command": "red", "room": "kitchen"},
+    "Kitchen OFF": {"command": "off", "room": "kitchen"},
+    "Bedroom ON (Blue)": {"command": "blue", "room": "bedroom"},
+    "Bedroom OFF": {"command": "off", "room": "bedroom"},
+    "Bathroom ON (Green)": {"command": "green", "room": "bathroom"},
+    "Bathroom OFF": {"command": "off", "room": "bathroom"},
+}
+# Serialized once at import; payloads matching one of these are known to be valid JSON.
+_EXAMPLES_SERIALIZED = [(name, orjson.dumps(payload).decode()) for name, payload in EXAMPLES.items()]
+_KNOWN_VALID_PAYLOADS = frozenset(payload_str for _, payload_str in _EXAMPLES_SERIALIZED)
+# The whole examples block, inserted into the text widget with a single Tk call
+_EXAMPLES_TEXT = "".join(f'--- {name} ---\n{payload_str}\n\n' for name, payload_str in _EXAMPLES_SERIALIZED)
+
 class CommandGUI:
     def __init__(self, root):
         self.root = root
@@ -18,6 +50,10 @@ class CommandGUI:
 
         self.client = None
         self.is_connected = False
+        self._want_connection = False # False once the user disconnects, so a drop isn't reconnected
+        self._reconnect_delay_ms = RECONNECT_MIN_DELAY_MS
+        # Outgoing (topic, payload) pairs, flushed together on the next MQTT poll
+        self._outbox = deque()
 
         # --- Frames ---
         control_frame = tk.Frame(root, padx=10, pady=10)
@@ -53,8 +89,17 @@ class CommandGUI:
         self.payload_entry = scrolledtext.ScrolledText(command_frame, height=5, wrap=tk.WORD)
         self.payload_entry.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        self.send_button = tk.Button(command_frame, text="Send Command", command=self.publish_message, state="disabled")
-        self.send_button.pack(pady=5)
+        send_frame = tk.Frame(command_frame)
+        send_frame.pack(pady=5)
+        self.send_button = tk.Button(send_frame, text="Send Command", command=self.publish_message, state="disabled")
+        self.send_button.pack(side=tk.LEFT, padx=5)
+        self.burst_button = tk.Button(send_frame, text="Burst Send", command=self.publish_burst, state="disabled")
+        self.burst_button.pack(side=tk.LEFT, padx=5)
+        tk.Label(send_frame, text="Copies:").pack(side=tk.LEFT)
+        self.burst_count = tk.Spinbox(send_frame, from_=1, to=1000, width=6)
+        self.burst_count.delete(0, tk.END)
+        self.burst_count.insert(0, "10")
+        self.burst_count.pack(side=tk.LEFT, padx=5)
 
         # --- Example Commands ---
         tk.Label(command_frame, text="Example Commands:").pack(anchor="w", pady=(10, 2))
@@ -71,18 +116,16 @@ class CommandGUI:
         self.fetch_config()
 
     def log(self, message):
-        def _log():
-            timestamp = time.strftime('%H:%M:%S')
-            self.log_text.config(state="normal")
-            self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.log_text.config(state="disabled")
-            self.log_text.see(tk.END)
-        self.root.after(0, _log)
+        timestamp = time.strftime('%H:%M:%S')
+        self.log_text.config(state="normal")
+        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        self.log_text.config(state="disabled")
+        self.log_text.see(tk.END)
 
     def fetch_config(self):
         try:
             # Fetch MQTT Settings
-            mqtt_response = requests.get(f"{API_BASE_URL}/mqtt-settings")
+            mqtt_response = _SESSION.get(f"{API_BASE_URL}/mqtt-settings", timeout=HTTP_TIMEOUT)
             mqtt_response.raise_for_status()
             mqtt_settings = mqtt_response.json()
             
@@ -98,16 +141,12 @@ class CommandGUI:
             self.log("Successfully fetched MQTT settings.")
 
             # Fetch Actuator Topic
-            actuator_response = requests.get(f"{API_BASE_URL}/actuator-mappings")
-            actuator_response.raise_for_status()
-            actuator_mappings = actuator_response.json()
-            
+            actuator_response = _SESSION.get(f"{API_BASE_URL}/actuator-mappings/{ACTUATOR_ID_TO_FIND}", timeout=HTTP_TIMEOUT)
             topic = "N/A"
-            for mapping in actuator_mappings:
-                if mapping.get("actuator_id") == ACTUATOR_ID_TO_FIND:
-                    # Corrected the topic key based on user feedback
-                    topic = mapping.get("command_topic") or "N/A"
-                    break
+            if actuator_response.status_code != 404: # 404 means no mapping for this actuator
+                actuator_response.raise_for_status()
+                # Corrected the topic key based on user feedback
+                topic = actuator_response.json().get("command_topic") or "N/A"
             
             self.topic_entry.config(state="normal")
             self.topic_entry.delete(0, tk.END)
@@ -120,19 +159,7 @@ class CommandGUI:
             messagebox.showerror("Config Error", f"Could not fetch configuration from API.\nEnsure the main server is running.\n\nError: {e}")
 
     def populate_examples(self):
-        examples = {
-            "Living Room ON (White)": {"command": "on", "room": "living_room"},
-            "Living Room OFF": {"command": "off", "room": "living_room"},
-            "Kitchen ON (Red)": {"command": "red", "room": "kitchen"},
-            "Kitchen OFF": {"command": "off", "room": "kitchen"},
-            "Bedroom ON (Blue)": {"command": "blue", "room": "bedroom"},
-            "Bedroom OFF": {"command": "off", "room": "bedroom"},
-            "Bathroom ON (Green)": {"command": "green", "room": "bathroom"},
-            "Bathroom OFF": {"command": "off", "room": "bathroom"},
-        }
-        for name, payload in examples.items():
-            payload_str = json.dumps(payload)
-            self.examples_text.insert(tk.END, f'--- {name} ---\n{payload_str}\n\n')
+        self.examples_text.insert(tk.END, _EXAMPLES_TEXT)
 
     def toggle_connection(self):
         if self.is_connected:
@@ -145,39 +172,98 @@ class CommandGUI:
                 return
             try:
                 port = int(port_str)
-                threading.Thread(target=self.mqtt_connect, args=(broker, port), daemon=True).start()
             except ValueError:
                 messagebox.showerror("Connection Error", "Invalid port number.")
+                return
+            self.mqtt_connect(broker, port)
 
     def mqtt_connect(self, broker, port):
+        client = self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        client.on_connect = self.on_connect
+        client.on_disconnect = self.on_disconnect
+        self._want_connection = True
+        self._reconnect_delay_ms = RECONNECT_MIN_DELAY_MS
+
+        self.log(f"Connecting to {broker}:{port}...")
+        self._connect_in_background(client, True, client.connect, broker, port, 60)
+
+    def _connect_in_background(self, client, initial, connect, *args):
+        """
+        Runs the blocking connect (DNS lookup and TCP handshake) on a short-lived
+        thread so the GUI stays responsive, then hands the client back to Tk's
+        event loop to be polled.
+        """
+        def run():
+            try:
+                connect(*args)
+            except Exception as e:
+                self.root.after(0, self._on_connect_error, client, initial, e)
+            else:
+                self.root.after(0, self._poll_mqtt, client)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_connect_error(self, client, initial, e):
+        if client is not self.client:
+            return # Replaced by a newer connection
+        if initial:
+            self._want_connection = False
+            self.log(f"MQTT Connection Error: {e}")
+            messagebox.showerror("MQTT Error", f"Failed to connect: {e}")
+        else:
+            self.log(f"Reconnect failed: {e}")
+            self._schedule_reconnect(client)
+
+    def _poll_mqtt(self, client):
+        """Runs one non-blocking pass of paho's network loop and reschedules itself."""
+        if client is not self.client:
+            return # Replaced by a newer connection
+        self._drain_outbox()
+        rc = client.loop(timeout=0.0)
+        if rc == mqtt.MQTT_ERR_SUCCESS:
+            self.root.after(MQTT_POLL_MS, self._poll_mqtt, client)
+        elif self._want_connection:
+            self._schedule_reconnect(client)
+
+    def _schedule_reconnect(self, client):
+        delay = self._reconnect_delay_ms
+        self._reconnect_delay_ms = min(delay * 2, RECONNECT_MAX_DELAY_MS)
+        self.log(f"Reconnecting in {delay / 1000:g} s...")
+        self.root.after(delay, self._reconnect, client)
+
+    def _reconnect(self, client):
+        if client is self.client and self._want_connection:
+            self._connect_in_background(client, False, client.reconnect)
+
+    def _drain_outbox(self):
+        """Publishes everything queued since the last poll in one tight loop, with no Tk calls in between."""
+        outbox = self._outbox
+        publish = self.client.publish
         try:
-            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-            self.client.on_connect = self.on_connect
-            self.client.on_disconnect = self.on_disconnect
-            
-            self.log(f"Connecting to {broker}:{port}...")
-            self.client.connect(broker, port, 60)
-            self.client.loop_forever()
+            while outbox:
+                topic, payload = outbox.popleft()
+                publish(topic, payload, qos=0)
         except Exception as e:
-            self.log(f"MQTT Connection Error: {e}")
-            self.root.after(0, lambda: messagebox.showerror("MQTT Error", f"Failed to connect: {e}"))
+            outbox.clear()
+            self.log(f"Failed to publish: {e}")
 
     def on_connect(self, client, userdata, flags, rc, props):
         if rc == 0:
             self.log("Successfully connected to MQTT broker.")
             self.is_connected = True
-            self.root.after(0, self.update_ui_for_connection)
+            self._reconnect_delay_ms = RECONNECT_MIN_DELAY_MS
+            self.update_ui_for_connection()
         else:
             self.log(f"Failed to connect, return code {rc}")
 
-    def on_disconnect(self, client, userdata, rc, props):
+    def on_disconnect(self, client, userdata, flags, rc, props):
         self.log("Disconnected from MQTT broker.")
         self.is_connected = False
-        self.root.after(0, self.update_ui_for_disconnection)
+        self.update_ui_for_disconnection()
 
     def mqtt_disconnect(self):
         if self.client:
-            self.client.loop_stop()
+            self._want_connection = False
             self.client.disconnect()
             self.log("Disconnecting...")
 
@@ -185,35 +271,57 @@ class CommandGUI:
         self.status_label.config(text="Status: Connected", fg="green")
         self.connect_button.config(text="Disconnect")
         self.send_button.config(state="normal")
+        self.burst_button.config(state="normal")
 
     def update_ui_for_disconnection(self):
         self.status_label.config(text="Status: Disconnected", fg="red")
         self.connect_button.config(text="Connect")
         self.send_button.config(state="disabled")
+        self.burst_button.config(state="disabled")
+        self._outbox.clear()
 
-    def publish_message(self):
+    def _read_command(self):
+        """Returns the (topic, payload) to send, or None after warning the user."""
         topic = self.topic_entry.get()
         payload = self.payload_entry.get("1.0", tk.END).strip()
         
         if not self.is_connected:
             messagebox.showwarning("Warning", "Not connected to MQTT broker.")
-            return
+            return None
         if not topic or topic == "N/A":
             messagebox.showwarning("Warning", "MQTT topic not set.")
-            return
+            return None
         if not payload:
             messagebox.showwarning("Warning", "Payload is empty.")
-            return
+            return None
             
         try:
-            json.loads(payload) # Validate JSON
-            self.client.publish(topic, payload)
-            self.log(f"Published to '{topic}': {payload}")
-        except json.JSONDecodeError:
+            if payload not in _KNOWN_VALID_PAYLOADS:
+                orjson.loads(payload) # Validate JSON
+        except orjson.JSONDecodeError:
             messagebox.showerror("Error", "Payload is not valid JSON.")
-        except Exception as e:
-            self.log(f"Failed to publish: {e}")
-            messagebox.showerror("Error", f"Failed to publish message: {e}")
+            return None
+        return topic, payload
+
+    def publish_message(self):
+        command = self._read_command()
+        if command is None:
+            return
+        self._outbox.append(command)
+        self.log(f"Published to '{command[0]}': {command[1]}")
+
+    def publish_burst(self):
+        """Queues N copies of the current payload for stress-testing the pipeline."""
+        try:
+            copies = int(self.burst_count.get())
+        except ValueError:
+            messagebox.showerror("Error", "Number of copies must be an integer.")
+            return
+        command = self._read_command()
+        if command is None or copies < 1:
+            return
+        self._outbox.extend([command] * copies)
+        self.log(f"Published {copies} copies to '{command[0]}': {command[1]}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,17 +1,32 @@
 import paho.mqtt.client as mqtt
 import json
+import orjson
+import queue
 import time
 import os
+import threading
 import tkinter as tk
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- Configuration ---
 ACTUATOR_ID = "smart_lamp"
-API_URL = "http://localhost:8000/api/actuator-mappings"
+API_URL = f"http://localhost:8000/api/actuator-mappings/{ACTUATOR_ID}"
+
+# Reused HTTP session so consecutive API calls share one keep-alive connection.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=Retry(total=2, backoff_factor=0.1)))
+HTTP_TIMEOUT = (2, 5) # (connect, read) seconds
 
 
 # --- GUI Class ---
 class LampGUI:
+    COLOR_MAP = {
+        "off": "grey", "white": "white", "red": "#ff4d4d",
+        "green": "#73d13d", "blue": "#40a9ff"
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Smart Lamp Simulator - House Plan")
@@ -44,9 +59,26 @@ class LampGUI:
             
             self.room_elements[room_id] = {"rect": rect, "label": label, "bulb": bulb, "status_text": status_text}
 
+        # Latest requested state per room, applied in one flush per Tk idle cycle
+        self._pending = {}
+        self._flush_scheduled = False
+        self._pending_lock = threading.Lock()
+
     def update_state(self, room, state):
-        # Schedule the GUI update to run in the main thread
-        self.root.after(0, self._update_ui, room, state)
+        # Called from the MQTT thread: record the latest state and schedule a single flush
+        with self._pending_lock:
+            self._pending[room] = state
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.root.after_idle(self._flush)
+
+    def _flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        for room, state in pending.items():
+            self._update_ui(room, state)
         
     def _update_ui(self, room, state):
         if room not in self.room_elements:
@@ -54,40 +86,31 @@ class LampGUI:
             return
 
         elements = self.room_elements[room]
-        bulb = elements["bulb"]
-        status_text = elements["status_text"]
-
-        color_map = {
-            "off": "grey", "white": "white", "red": "#ff4d4d",
-            "green": "#73d13d", "blue": "#40a9ff"
-        }
+        bulb_color = self.COLOR_MAP.get(state, "white")
         
-        bulb_color = color_map.get(state, "white")
-        
-        self.canvas.itemconfig(bulb, fill=bulb_color)
+        self.canvas.itemconfigure(elements["bulb"], fill=bulb_color)
         
         if state == "off":
-            self.canvas.itemconfig(status_text, text="OFF", fill="#a0a0a0")
+            self.canvas.itemconfigure(elements["status_text"], text="OFF", fill="#a0a0a0")
         else:
-            self.canvas.itemconfig(status_text, text=state.upper(), fill="white")
+            self.canvas.itemconfigure(elements["status_text"], text=state.upper(), fill="white")
 
 
 # --- Load Configuration via API ---
 def fetch_config():
     """Fetches actuator mappings from the central configuration API."""
     try:
-        response = requests.get(API_URL)
+        response = _SESSION.get(API_URL, timeout=HTTP_TIMEOUT)
+        if response.status_code == 404:
+            print(f"ERROR: No configuration mapping found for actuator_id '{ACTUATOR_ID}' in API response.")
+            return None
         response.raise_for_status()  # Raise an exception for bad status codes
-        mappings = response.json()
-        
-        for mapping in mappings:
-                if mapping.get("actuator_id") == ACTUATOR_ID:
-                    print(f"Configuration found for '{ACTUATOR_ID}':")
-                    print(f"  - Command Topic (Validated): {mapping.get('command_validated_topic')}")
-                    print(f"  - Status Topic (Raw): {mapping.get('status_topic')}")
-                    return mapping
-                
-        print(f"ERROR: No configuration mapping found for actuator_id '{ACTUATOR_ID}' in API response.")
+        mapping = response.json()
+
+        print(f"Configuration found for '{ACTUATOR_ID}':")
+        print(f"  - Command Topic (Validated): {mapping.get('command_validated_topic')}")
+        print(f"  - Status Topic (Raw): {mapping.get('status_topic')}")
+        return mapping
         
     except requests.exceptions.RequestException as e:
         print(f"ERROR: Could not fetch configuration from API: {e}")
@@ -121,6 +144,10 @@ class SmartLampSimulator:
         self.broker = "broker.hivemq.com"
         self.port = 1883
 
+        # Commands are parsed on a worker thread so paho's network thread only enqueues
+        self._rx_q = queue.SimpleQueue()
+        threading.Thread(target=self._worker, daemon=True).start()
+
     def on_connect(self, client, userdata, flags, rc, props):
         if rc == 0:
             print("[Simulator] Connected to MQTT Broker.")
@@ -135,9 +162,24 @@ class SmartLampSimulator:
             print(f"[Simulator] Failed to connect, return code {rc}\n")
 
     def on_message(self, client, userdata, msg):
-        print(f"[Simulator] Command received on '{msg.topic}': {msg.payload.decode()}")
+        self._rx_q.put((msg.topic, msg.payload))
+
+    def _worker(self):
+        while True:
+            topic, payload = self._rx_q.get()
+            # This is the only thread handling commands; one bad message must not stop it
+            try:
+                self._handle_command(topic, payload)
+            except Exception as e:
+                print(f"[Simulator] Error: Failed to handle command from '{topic}': {e}")
+
+    def _handle_command(self, topic, payload):
+        print(f"[Simulator] Command received on '{topic}': {payload.decode(errors='replace')}")
         try:
-            data = json.loads(msg.payload.decode())
+            data = orjson.loads(payload)
+            if type(data) is not dict:
+                print("[Simulator] Error: Command must be a JSON object.")
+                return
             command = data.get("command")
             room = data.get("room")
 
@@ -160,20 +202,20 @@ class SmartLampSimulator:
             self.gui.update_state(room, command)
             self.publish_status(room)
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print("[Simulator] Error: Could not decode incoming command JSON.")
 
     def publish_status(self, room):
         """Publishes the current state of the lamp for a specific room."""
         current_state = self.room_states.get(room, "off")
-        payload = json.dumps({
+        payload = orjson.dumps({
             "actuator_id": self.actuator_id,
             "room": room,
             "status": current_state,
             "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
         })
-        self.client.publish(self.status_topic, payload)
-        print(f"[Simulator] Status for '{room}' published to '{self.status_topic}': {payload}")
+        self.client.publish(self.status_topic, payload) # paho accepts the bytes as-is
+        print(f"[Simulator] Status for '{room}' published to '{self.status_topic}': {payload.decode()}")
 
     def start(self):
         print(f"[Simulator] Starting '{self.actuator_id}'...")
@@ -1,15 +1,23 @@
 from contextlib import asynccontextmanager
+import asyncio
 import json
 import uvicorn
 import glob
 import os
-from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+import threading
+from copy import deepcopy
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from prometheus_client import make_asgi_app
 import ast
+import re
+import hashlib
+import tempfile
+from email.utils import formatdate
 import aiofiles
+import orjson
 
 # Import the MQTT manager
 from mqtt_manager import start_mqtt_client, restart_mqtt_client, stop_mqtt_client
@@ -32,14 +40,24 @@ class ConnectionManager:
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        # Send to all clients concurrently so one slow client doesn't delay the rest
+        connections = list(self.active_connections)
+        results = await asyncio.gather(*(c.send_text(message) for c in connections), return_exceptions=True)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 manager = ConnectionManager()
-app = FastAPI(lifespan=lifespan)
+# Route return values are encoded with orjson instead of the stdlib json encoder
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+def no_store(response: Response):
+    """Dependency that marks an API response as non-cacheable."""
+    response.headers["Cache-Control"] = "no-store"
 
 # Create a separate app for Prometheus metrics
 metrics_app = make_asgi_app()
@@ -49,6 +67,12 @@ CONFIG_FILE = "config.json"
 ACTUATOR_CONFIG_FILE = "actuator_config.json" # New config file for actuators
 SCHEMAS_DIR = "schemas"
 os.makedirs(SCHEMAS_DIR, exist_ok=True)
+ACTUATOR_SCHEMAS_DIR = f"{SCHEMAS_DIR}/actuators"
+# Schema paths are stored in the configs with forward slashes, e.g. "schemas/sensor1.json"
+_SCHEMAS_PREFIX = SCHEMAS_DIR.replace("\\", "/") + "/"
+_ACTUATOR_SCHEMAS_PREFIX = ACTUATOR_SCHEMAS_DIR.replace("\\", "/") + "/"
+# A plain '<name>.json' file name: no path separators, no leading dot.
+_SAFE_NAME = re.compile(r"[A-Za-z0-9_\-][A-Za-z0-9_.\-]*\.json")
 
 # --- WebSocket Endpoint ---
 @app.websocket("/ws/config-updates")
@@ -60,24 +84,82 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
-# --- Static Files and Favicon ---
-@app.get("/favicon.ico", include_in_schema=False)
-async def favicon():
-    return PlainTextResponse("", status_code=204)
-
+# --- Static Files ---
+# The favicon is served from here too (/static/favicon.ico), never by a route handler.
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="static")
 
+class SchemaStaticFiles(StaticFiles):
+    """StaticFiles that makes browsers revalidate (via ETag) instead of reusing a stale schema."""
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+# Fast read path for stored schemas: files are validated on write, so they are
+# served straight from disk without going through a Python handler.
+app.mount("/api/schemas-raw", SchemaStaticFiles(directory=SCHEMAS_DIR), name="schemas_raw")
+
 # --- Config Helper Functions ---
-def read_config():
-    if not os.path.exists(CONFIG_FILE):
-        return {"mqtt_settings": {}, "topic_mappings": []}
-    with open(CONFIG_FILE, "r") as f:
-        return json.load(f)
+# The parsed config.json is kept in memory and only re-read when its mtime changes.
+# The GET endpoints are served from pre-serialized bytes of each section.
+_CFG_CACHE = {"mtime": None, "data": None, "mqtt_settings": b"{}", "topic_mappings": b"[]", "lock": threading.Lock()}
+
+def _cache_config(config, mtime):
+    _CFG_CACHE["mtime"] = mtime
+    _CFG_CACHE["data"] = config
+    _CFG_CACHE["mqtt_settings"] = json.dumps(config.get("mqtt_settings", {})).encode()
+    _CFG_CACHE["topic_mappings"] = json.dumps(config.get("topic_mappings", [])).encode()
+
+def _load_config():
+    """Returns the cached config, re-reading config.json only if it changed on disk."""
+    with _CFG_CACHE["lock"]:
+        try:
+            mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        except FileNotFoundError:
+            _cache_config({"mqtt_settings": {}, "topic_mappings": []}, None)
+            return _CFG_CACHE["data"]
+        if mtime != _CFG_CACHE["mtime"]:
+            with open(CONFIG_FILE, "rb") as f:
+                _cache_config(orjson.loads(f.read()), mtime)
+        return _CFG_CACHE["data"]
+
+def read_config(copy=True):
+    """
+    Returns the config dict. Callers that only read it can pass copy=False to
+    get the shared cached object instead of a private deep copy.
+    """
+    config = _load_config()
+    return deepcopy(config) if copy else config
+
+def read_config_section_bytes(section):
+    """Returns the cached JSON bytes of a config section ('mqtt_settings' or 'topic_mappings')."""
+    _load_config()
+    return _CFG_CACHE[section]
+
+def _make_temp_file(filepath):
+    """
+    Creates a uniquely named hidden temp file next to `filepath`, so concurrent
+    writers never share one and os.replace stays on the same filesystem.
+    Returns (fd, tmp_path); mkstemp's 0600 mode is widened to a regular file's.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or ".", prefix=".", suffix=".tmp")
+    os.chmod(tmp_path, 0o644)
+    return fd, tmp_path
 
 def write_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    fd, tmp_path = _make_temp_file(CONFIG_FILE)
+    try:
+        with open(fd, "w") as f:
+            json.dump(config, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_FILE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    with _CFG_CACHE["lock"]:
+        _cache_config(deepcopy(config), os.stat(CONFIG_FILE).st_mtime_ns)
 
 # --- Actuator Config Helper Functions (New) ---
 def read_actuator_config():
@@ -90,6 +172,38 @@ def write_actuator_config(config):
     with open(ACTUATOR_CONFIG_FILE, "w") as f:
         json.dump(config, f, indent=2)
 
+_ACTUATOR_INDEX = {"mtime": None, "by_id": {}}
+
+def get_actuator_mapping(actuator_id):
+    """Looks up a single actuator mapping by id, re-indexing only when the config file changes."""
+    try:
+        mtime = os.stat(ACTUATOR_CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if mtime != _ACTUATOR_INDEX["mtime"]:
+        mappings = read_actuator_config().get("actuator_mappings", [])
+        _ACTUATOR_INDEX["by_id"] = {m.get("actuator_id"): m for m in mappings}
+        _ACTUATOR_INDEX["mtime"] = mtime
+    return _ACTUATOR_INDEX["by_id"].get(actuator_id)
+
+# --- Schema File Helper Functions ---
+async def write_file_atomic(filepath, data):
+    """
+    Writes bytes to a temporary file next to `filepath` and swaps it in with
+    os.replace, so readers never see a partially written schema.
+    """
+    fd, tmp_path = _make_temp_file(filepath)
+    try:
+        async with aiofiles.open(fd, "wb") as f:
+            await f.write(data)
+            await f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    invalidate_schema_list(os.path.dirname(filepath))
+
 # --- Web Page Routes ---
 @app.get("/", response_class=HTMLResponse)
 async def serve_dashboard_root(request: Request):
@@ -116,9 +230,8 @@ async def serve_actuator_admin(request: Request):
 # --- Main Configuration API Routes ---
 @app.get("/api/mqtt-settings")
 async def get_mqtt_settings():
-    config = read_config()
     headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=config.get("mqtt_settings", {}), headers=headers)
+    return Response(content=read_config_section_bytes("mqtt_settings"), media_type="application/json", headers=headers)
 
 @app.post("/api/mqtt-settings")
 async def update_mqtt_settings(request: Request):
@@ -132,13 +245,12 @@ async def update_mqtt_settings(request: Request):
     
     restart_mqtt_client()
     await manager.broadcast("config_updated")
-    return JSONResponse(content={"message": "MQTT settings updated successfully."})
+    return {"message": "MQTT settings updated successfully."}
 
 @app.get("/api/topic-mappings")
 async def get_topic_mappings():
-    config = read_config()
     headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=config.get("topic_mappings", []), headers=headers)
+    return Response(content=read_config_section_bytes("topic_mappings"), media_type="application/json", headers=headers)
 
 @app.post("/api/topic-mappings")
 async def update_topic_mappings(request: Request):
@@ -148,14 +260,21 @@ async def update_topic_mappings(request: Request):
     write_config(config)
     restart_mqtt_client()
     await manager.broadcast("config_updated")
-    return JSONResponse(content={"message": "Topic mappings updated successfully."})
+    return {"message": "Topic mappings updated successfully."}
 
 # --- Actuator Configuration API Routes (New) ---
-@app.get("/api/actuator-mappings")
+@app.get("/api/actuator-mappings", dependencies=[Depends(no_store)])
 async def get_actuator_mappings():
     config = read_actuator_config()
-    headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=config.get("actuator_mappings", []), headers=headers)
+    return config.get("actuator_mappings", [])
+
+@app.get("/api/actuator-mappings/{actuator_id}", dependencies=[Depends(no_store)])
+async def get_actuator_mapping_by_id(actuator_id: str):
+    """Returns the mapping of a single actuator, so clients don't have to scan the full list."""
+    mapping = get_actuator_mapping(actuator_id)
+    if mapping is None:
+        raise HTTPException(status_code=404, detail=f"No mapping found for actuator '{actuator_id}'.")
+    return mapping
 
 @app.post("/api/actuator-mappings")
 async def update_actuator_mappings(request: Request):
@@ -169,63 +288,93 @@ async def update_actuator_mappings(request: Request):
     # Restart MQTT to apply changes
     restart_mqtt_client()
     await manager.broadcast("config_updated") # Notify dashboards
-    return JSONResponse(content={"message": "Actuator mappings updated successfully."})
+    return {"message": "Actuator mappings updated successfully."}
 
 
 # --- Schema File Management API Routes ---
+# Sorted schema listings per directory, reused until the directory's mtime changes.
+_SCHEMA_LIST_CACHE = {}
+
+def _schema_list_entry(directory):
+    """Returns (mtime, files, body, etag) for a schema directory, rescanning only if it changed."""
+    mtime = os.stat(directory).st_mtime_ns
+    cached = _SCHEMA_LIST_CACHE.get(directory)
+    if cached and cached[0] == mtime:
+        return cached
+    prefix = directory.replace("\\", "/")
+    with os.scandir(directory) as it:
+        files = sorted(f"{prefix}/{e.name}" for e in it if e.name.endswith('.json') and e.is_file(follow_symlinks=False))
+    body = orjson.dumps(files)
+    etag = f'"{hashlib.sha256(body).hexdigest()}"'
+    cached = _SCHEMA_LIST_CACHE[directory] = (mtime, files, body, etag)
+    return cached
+
+def list_schema_files(directory):
+    """Returns the sorted '.json' file paths in a schema directory."""
+    return _schema_list_entry(directory)[1]
+
+def schema_list_response(request: Request, directory):
+    """
+    Serves a schema list with ETag/Last-Modified validators; a client that
+    already holds the current list gets an empty 304 instead of the body.
+    """
+    mtime, _, body, etag = _schema_list_entry(directory)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(mtime / 1e9, usegmt=True),
+        "Cache-Control": "no-cache", # always revalidate, so new schemas show up immediately
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def invalidate_schema_list(directory=SCHEMAS_DIR):
+    _SCHEMA_LIST_CACHE.pop(directory, None)
+
 @app.get("/api/schemas")
-async def get_all_schema_files():
+async def get_all_schema_files(request: Request):
     """Returns a list of available schema file paths."""
-    schema_files = [os.path.join(SCHEMAS_DIR, f).replace("\\", "/") for f in os.listdir(SCHEMAS_DIR) if f.endswith('.json')]
-    headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=sorted(schema_files), headers=headers)
+    return schema_list_response(request, SCHEMAS_DIR)
 
 # --- Actuator Schema API Routes (New) ---
 @app.get("/api/actuator-schemas")
-async def get_all_actuator_schema_files():
+async def get_all_actuator_schema_files(request: Request):
     """Returns a list of available schema files from the 'schemas/actuators' directory."""
-    actuator_schemas_dir = os.path.join(SCHEMAS_DIR, "actuators")
+    actuator_schemas_dir = ACTUATOR_SCHEMAS_DIR
     if not os.path.isdir(actuator_schemas_dir):
-        return JSONResponse(content=[], headers={"Cache-Control": "no-store"})
+        return []
         
-    schema_files = [os.path.join(actuator_schemas_dir, f).replace("\\", "/") for f in os.listdir(actuator_schemas_dir) if f.endswith('.json')]
-    headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=sorted(schema_files), headers=headers)
+    return schema_list_response(request, actuator_schemas_dir)
 
 
 # --- Sensor Schema Management (Refactored for clarity) ---
 @app.get("/api/schemas/{filename}")
 async def get_schema_file_content(filename: str):
     """Returns the JSON content of a specific schema file."""
-    if ".." in filename or filename.startswith("/"):
+    if not _SAFE_NAME.fullmatch(filename):
         raise HTTPException(status_code=400, detail="Invalid filename.")
     
-    schema_path = os.path.join(SCHEMAS_DIR, filename)
+    schema_path = f"{SCHEMAS_DIR}/{filename}"
     if not os.path.exists(schema_path):
         raise HTTPException(status_code=404, detail="Schema file not found.")
     
-    headers = {"Cache-Control": "no-store"}
-    with open(schema_path, "r") as f:
-        content = json.load(f)
-    return JSONResponse(content=content, headers=headers)
+    # Kept for backward compatibility; the content is served by the static mount.
+    return RedirectResponse(url=f"/api/schemas-raw/{filename}", status_code=307)
 
 
 # --- Actuator Schema Management (New) ---
 @app.get("/api/actuator-schemas/{filename}")
 async def get_actuator_schema_content(filename: str):
     """Returns the JSON content of a specific actuator schema file."""
-    if ".." in filename or filename.startswith("/"):
+    if not _SAFE_NAME.fullmatch(filename):
         raise HTTPException(status_code=400, detail="Invalid filename.")
     
     # CORRECTED: Added the "actuators" subdirectory to the path
-    schema_path = os.path.join(SCHEMAS_DIR, "actuators", filename)
+    schema_path = _ACTUATOR_SCHEMAS_PREFIX + filename
     if not os.path.exists(schema_path):
         raise HTTPException(status_code=404, detail="Actuator schema file not found.")
     
-    headers = {"Cache-Control": "no-store"}
-    async with aiofiles.open(schema_path, "r") as f:
-        content = json.loads(await f.read())
-    return JSONResponse(content=content, headers=headers)
+    return RedirectResponse(url=f"/api/schemas-raw/actuators/{filename}", status_code=307)
 
 @app.post("/api/actuator-schemas")
 async def create_actuator_schema(request: Request):
@@ -237,16 +386,16 @@ async def create_actuator_schema(request: Request):
     if not all([filename, isinstance(content_str, str), filename.endswith(".json")]):
         raise HTTPException(status_code=400, detail="Invalid request format.")
 
-    filepath = os.path.join(SCHEMAS_DIR, "actuators", filename)
+    filepath = _ACTUATOR_SCHEMAS_PREFIX + filename
     if os.path.exists(filepath):
         raise HTTPException(status_code=400, detail=f"Schema '{filename}' already exists.")
 
     try:
-        parsed_json = json.loads(content_str)
-        async with aiofiles.open(filepath, "w") as f:
-            await f.write(json.dumps(parsed_json, indent=4))
-        return JSONResponse({"message": f"Actuator schema '{filename}' created."})
-    except json.JSONDecodeError:
+        raw = content_str.encode('utf-8')
+        orjson.loads(raw) # Validate only; the client's formatting is kept as-is
+        await write_file_atomic(filepath, raw)
+        return {"message": f"Actuator schema '{filename}' created."}
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Content is not valid JSON.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write file: {e}")
@@ -254,48 +403,55 @@ async def create_actuator_schema(request: Request):
 @app.put("/api/actuator-schemas/{filename}")
 async def update_actuator_schema(filename: str, request: Request):
     """Updates an existing actuator schema file."""
-    filepath = os.path.join(SCHEMAS_DIR, "actuators", filename)
+    filepath = _ACTUATOR_SCHEMAS_PREFIX + filename
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="Schema file not found.")
 
-    content_str = (await request.body()).decode('utf-8')
+    raw = await request.body()
     try:
-        parsed_json = json.loads(content_str)
-        async with aiofiles.open(filepath, "w") as f:
-            await f.write(json.dumps(parsed_json, indent=4))
-        restart_mqtt_client()
-        return JSONResponse({"message": f"Actuator schema '{filename}' updated."})
-    except json.JSONDecodeError:
+        orjson.loads(raw) # Validate only; the client's formatting is kept as-is
+        await write_file_atomic(filepath, raw)
+        restart_mqtt_client(schemas_changed=True)
+        return {"message": f"Actuator schema '{filename}' updated."}
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Content is not valid JSON.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write file: {e}")
 
-@app.delete("/api/actuator-schemas/{filename}")
-async def delete_actuator_schema(filename: str):
-    """Deletes an actuator schema and updates actuator_config.json."""
-    filepath = os.path.join(SCHEMAS_DIR, "actuators", filename)
-    if not os.path.exists(filepath):
-        raise HTTPException(status_code=404, detail="Schema file not found.")
-        
+def _delete_actuator_schema_and_unmap(filepath):
+    """Removes an actuator schema and clears it from actuator_config.json. Returns True if the config changed."""
     os.remove(filepath)
+    invalidate_schema_list(ACTUATOR_SCHEMAS_DIR)
     
     config = read_actuator_config()
-    schema_path_to_remove = os.path.join(SCHEMAS_DIR, "actuators", filename).replace("\\", "/")
     updated = False
     for mapping in config.get("actuator_mappings", []):
-        if mapping.get("command_schema") == schema_path_to_remove:
+        if mapping.get("command_schema") == filepath:
             mapping["command_schema"] = ""
             updated = True
-        if mapping.get("status_schema") == schema_path_to_remove:
+        if mapping.get("status_schema") == filepath:
             mapping["status_schema"] = ""
             updated = True
             
     if updated:
         write_actuator_config(config)
+    return updated
+
+@app.delete("/api/actuator-schemas/{filename}")
+async def delete_actuator_schema(filename: str):
+    """Deletes an actuator schema and updates actuator_config.json."""
+    filepath = _ACTUATOR_SCHEMAS_PREFIX + filename
+    try:
+        # File and config I/O run in a worker thread to keep the event loop free
+        updated = await asyncio.to_thread(_delete_actuator_schema_and_unmap, filepath)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Schema file not found.")
+            
+    if updated:
         restart_mqtt_client()
         await manager.broadcast("config_updated")
         
-    return JSONResponse({"message": f"Actuator schema '{filename}' deleted."})
+    return {"message": f"Actuator schema '{filename}' deleted."}
 
 
 # --- Sensor Schema Creation/Update/Delete (No changes below this line for this task) ---
@@ -311,85 +467,86 @@ async def create_schema(request: Request):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid request format. Expecting JSON with 'filename' and 'content' keys.")
 
-    if ".." in filename or not filename.endswith(".json") or filename.startswith("/"):
+    if not _SAFE_NAME.fullmatch(filename):
         raise HTTPException(status_code=400, detail="Invalid or unsafe filename.")
         
-    filepath = os.path.join(SCHEMAS_DIR, filename)
+    filepath = f"{SCHEMAS_DIR}/{filename}"
     if os.path.exists(filepath):
         raise HTTPException(status_code=400, detail=f"Schema file '{filename}' already exists.")
 
+    raw = content_str.encode('utf-8')
     try:
-        # Validate that the content string is valid JSON
-        parsed_json = json.loads(content_str)
-        # Re-serialize with indentation to save it in a pretty format
-        json_to_write = json.dumps(parsed_json, indent=4)
-    except json.JSONDecodeError:
+        # Validate that the content is valid JSON; the client's formatting is kept as-is
+        orjson.loads(raw)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Schema content is not valid JSON.")
 
     try:
-        async with aiofiles.open(filepath, "w") as f:
-            await f.write(json_to_write)
-        return JSONResponse({"message": f"Schema '{filename}' created successfully."})
+        await write_file_atomic(filepath, raw)
+        return {"message": f"Schema '{filename}' created successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write schema file: {e}")
 
 
-@app.put("/api/schemas/{filename}")
+@app.put("/api/schemas/{filename}", dependencies=[Depends(no_store)])
 async def update_schema(filename: str, request: Request):
     """Updates an existing schema file with raw JSON content."""
-    if ".." in filename or not filename.endswith(".json") or filename.startswith("/"):
+    if not _SAFE_NAME.fullmatch(filename):
         raise HTTPException(status_code=400, detail="Invalid or unsafe filename.")
         
-    filepath = os.path.join(SCHEMAS_DIR, filename)
+    filepath = f"{SCHEMAS_DIR}/{filename}"
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail=f"Schema file '{filename}' not found.")
 
-    content_str = (await request.body()).decode('utf-8')
+    raw = await request.body()
 
     try:
-        # Validate that the content string is valid JSON and format it
-        parsed_json = json.loads(content_str)
-        json_to_write = json.dumps(parsed_json, indent=4)
-    except json.JSONDecodeError:
+        # Validate that the body is valid JSON; it is written back unchanged
+        orjson.loads(raw)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Schema content is not valid JSON.")
 
     try:
-        async with aiofiles.open(filepath, "w") as f:
-            await f.write(json_to_write)
+        await write_file_atomic(filepath, raw)
         
-        restart_mqtt_client()
+        restart_mqtt_client(schemas_changed=True)
         
-        return JSONResponse(
-            {"message": f"Schema '{filename}' updated successfully."},
-            headers={"Cache-Control": "no-store"}
-        )
+        return {"message": f"Schema '{filename}' updated successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to write schema file: {e}")
 
 
-@app.delete("/api/schemas/{filename}")
-async def delete_schema_file(filename: str):
-    """Deletes a schema file and updates any mappings that use it."""
-    file_path = os.path.join(SCHEMAS_DIR, filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Schema file not found.")
-        
+def _delete_schema_and_unmap(file_path):
+    """Removes a schema file and clears it from the topic mappings. Returns True if config.json changed."""
     os.remove(file_path)
+    invalidate_schema_list()
     
     config = read_config()
-    schema_path_to_remove = os.path.join(SCHEMAS_DIR, filename).replace("\\", "/")
     updated = False
     for mapping in config.get("topic_mappings", []):
-        if mapping.get("schema") == schema_path_to_remove:
+        if mapping.get("schema") == file_path:
             mapping["schema"] = ""
             updated = True
     
     if updated:
         write_config(config)
+    return updated
+
+@app.delete("/api/schemas/{filename}")
+async def delete_schema_file(filename: str):
+    """Deletes a schema file and updates any mappings that use it."""
+    file_path = _SCHEMAS_PREFIX + filename
+    try:
+        # File and config I/O run in a worker thread to keep the event loop free
+        updated = await asyncio.to_thread(_delete_schema_and_unmap, file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Schema file not found.")
+    
+    if updated:
         restart_mqtt_client()
         await manager.broadcast("config_updated")
         
-    return JSONResponse(content={"message": f"Schema file '{filename}' deleted and mappings updated."})
+    return {"message": f"Schema file '{filename}' deleted and mappings updated."}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -1,23 +1,49 @@
+import atexit
+import collections
+import functools
 import importlib.util
 import json
+import logging
+import logging.handlers
 import math
+import queue
+import re
+import sys
 import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import pandas as pd
 import paho.mqtt.client as mqtt
 import pandera.pandas as pa
-from pandera.errors import SchemaErrors
+from pandera.errors import SchemaError, SchemaErrors
 from utils import parse_pandera_errors
 
 # InfluxDB specific imports
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS, ASYNCHRONOUS
+from influxdb_client import InfluxDBClient
+from influxdb_client.client.write_api import WriteOptions, WriteType
 
 # Prometheus specific import
 from prometheus_client import Counter, Gauge, Enum
 
 
+# --- Per-message logging ---
+# Handlers log through a queue so worker threads never block on stderr; a
+# background listener does the writing. Set MQTT_LOG_LEVEL=WARNING to keep
+# only errors in production.
+logger = logging.getLogger("mqtt_manager")
+logger.setLevel(os.getenv("MQTT_LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler(sys.stderr)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop) # Drain what's left on exit
+
+
 MESSAGES_PROCESSED = Counter(
     'mqtt_messages_processed_total',
     'Total number of processed MQTT messages',
@@ -32,6 +58,12 @@ ACTUATOR_MESSAGES_PROCESSED = Counter(
 )
 
 
+# Messages discarded because a worker shard's queue was full (oldest first)
+MESSAGES_DROPPED = Counter(
+    'mqtt_messages_dropped_total',
+    "Total number of MQTT messages dropped because a worker shard's queue was full",
+    ['shard', 'topic']
+)
 
 ACTUATOR_STATE = Enum(
     'actuator_last_known_state',
@@ -41,9 +73,113 @@ ACTUATOR_STATE = Enum(
 )
 
 
+# How often buffered counter increments are applied to the Prometheus metrics
+METRICS_FLUSH_INTERVAL = 0.25 # seconds
+
+# Messages waiting in each worker shard's queue; beyond this the shard's
+# oldest ones are dropped
+WORK_QUEUE_SIZE = 10000
+
+# Sensor messages whose schema has no fast validator are validated by Pandera
+# together, one DataFrame per topic and payload shape, once a batch is this
+# big or this old
+BATCH_MAX_ROWS = 256
+BATCH_FLUSH_INTERVAL = 0.05 # seconds
+
+
+# --- InfluxDB Line Protocol Helpers ---
+# Same escaping rules as influxdb_client's Point
+_LP_ESCAPE_KEY = str.maketrans({"\\": "\\\\", ",": "\\,", " ": "\\ ", "=": "\\=", "\n": "\\n", "\t": "\\t", "\r": "\\r"})
+_LP_ESCAPE_STRING = str.maketrans({"\"": "\\\"", "\\": "\\\\"})
+
+def _lp_tags(**tags):
+    """Builds the ',key=value' tag section of a line, skipping empty values like Point does."""
+    return "".join(
+        f",{key}={str(value).translate(_LP_ESCAPE_KEY)}"
+        for key, value in tags.items() if value not in (None, "")
+    )
+
+def _lp_value(value):
+    """Formats a field value, or returns None for values InfluxDB can't ingest."""
+    if isinstance(value, bool):
+        formatted = "true" if value else "false"
+    elif isinstance(value, int):
+        formatted = f"{value}i"
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        formatted = repr(value)
+    elif isinstance(value, str):
+        formatted = f'"{value.translate(_LP_ESCAPE_STRING)}"'
+    else:
+        return None
+    return formatted
+
+def _lp_field(key, value):
+    """Formats one 'key=value' field, or returns None for values InfluxDB can't ingest."""
+    formatted = _lp_value(value)
+    if formatted is None:
+        return None
+    return f"{key.translate(_LP_ESCAPE_KEY)}={formatted}"
+
+# Payload keys stored as tags/time rather than as fields
+_STANDARD_KEYS = frozenset(("sensor_id", "timestamp"))
+
+def lp_field_keys(columns):
+    """Precomputes (key, 'escaped_key=') pairs for the field columns of a schema."""
+    return tuple((key, key.translate(_LP_ESCAPE_KEY) + "=") for key in columns if key not in _STANDARD_KEYS)
+
+def compile_lp_formatter(schema):
+    """
+    Generates a function that renders the field section of a line for a
+    payload that the schema's row validator has accepted (so every column is
+    present with its exact type). Fields come out in schema order from a
+    single f-string. The function returns None for non-finite floats, which
+    line protocol can't represent. Returns None for schemas it can't handle.
+    """
+    if schema.strict is not True:
+        return None
+    namespace = {"_isfinite": math.isfinite, "_BOOL": {True: "true", False: "false"}, "_STR_ESC": _LP_ESCAPE_STRING}
+    loads, finite, parts = [], [], []
+    for i, (key, column) in enumerate(schema.columns.items()):
+        if key in _STANDARD_KEYS:
+            continue
+        dtype_name = str(column.dtype)
+        # Braces are doubled because the key text ends up inside an f-string
+        key_eq = key.translate(_LP_ESCAPE_KEY).replace("{", "{{").replace("}", "}}") + "="
+        loads.append(f"    v{i} = data[{key!r}]")
+        if dtype_name == "float64":
+            finite.append(f"_isfinite(v{i})")
+            parts.append(f"{key_eq}{{v{i}!r}}")
+        elif dtype_name == "int64":
+            parts.append(f"{key_eq}{{v{i}}}i")
+        elif dtype_name == "bool":
+            parts.append(f"{key_eq}{{_BOOL[v{i}]}}")
+        elif dtype_name == "str":
+            parts.append(f'{key_eq}"{{v{i}.translate(_STR_ESC)}}"')
+        else:
+            return None
+    if not parts:
+        return None
+
+    lines = ["def format_fields(data):"] + loads
+    if finite:
+        lines.append(f"    if not ({' and '.join(finite)}): return None")
+    lines.append(f"    return f{','.join(parts)!r}")
+    exec(compile("\n".join(lines), "<line protocol formatter>", "exec"), namespace)
+    return namespace["format_fields"]
+
 # --- InfluxDB Writer Class ---
 class InfluxDBWriter:
+    # Upper bound on cached line prefixes, in case sensor_ids in payloads are unbounded
+    MAX_CACHED_PREFIXES = 1024
+
     def __init__(self):
+        # Line protocol prefixes ('measurement,tags ') are built once and reused
+        self._validated_prefixes = {} # (topic, sensor_id) -> prefix
+        self._failed_prefixes = {} # topic -> (message prefix, error prefix), without the per-error tags
+        # The full JSON report duplicates the payload and errors; only keep it on request
+        self.store_full_report = os.getenv("INFLUXDB_STORE_FULL_REPORT") == "1"
         self.url = os.getenv("INFLUXDB_URL")
         self.token = os.getenv("INFLUXDB_TOKEN")
         self.org = os.getenv("INFLUXDB_ORG")
@@ -56,65 +192,163 @@ class InfluxDBWriter:
             return
 
         print(f"[InfluxDB] Initializing writer for bucket '{self.bucket}'...")
-        self.client = InfluxDBClient(url=self.url, token=self.token, org=self.org)
+        # gzip shrinks the batched line protocol considerably on the wire
+        self.client = InfluxDBClient(url=self.url, token=self.token, org=self.org, enable_gzip=True, timeout=30_000)
         
-        self.write_api = self.client.write_api(write_options=ASYNCHRONOUS)
+        # Points are buffered and sent in batches (by default up to 5000 points
+        # or 1s) instead of one HTTP request per MQTT message.
+        batch_size = int(os.getenv("INFLUXDB_BATCH_SIZE", "5000"))
+        flush_interval = int(os.getenv("INFLUXDB_FLUSH_MS", "1000"))
+        print(f"[InfluxDB] Batching up to {batch_size} points or {flush_interval} ms per write.")
+        self.write_api = self.client.write_api(write_options=WriteOptions(
+            write_type=WriteType.batching,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            jitter_interval=200,
+            retry_interval=3000,
+            max_retries=3,
+            max_retry_delay=15000,
+            exponential_base=2
+        ))
 
-    def write_validated_data(self, topic, data):
+    def write_validated_data(self, topic, data, field_keys=None, format_fields=None):
+        """
+        `format_fields` (from compile_lp_formatter) renders all fields at once
+        when the row validator accepted the payload. `field_keys` (from
+        lp_field_keys) lists the payload's fields up front when the data was
+        validated against a strict schema; otherwise they're discovered from
+        the payload itself.
+        """
         if not self.write_api:
             return
 
-        # Dynamically add fields from the data payload
-        point = Point("mqtt_messages") \
-            .tag("topic", topic) \
-            .tag("status", "validated") \
-            .tag("sensor_id", data.get("sensor_id", "unknown"))
-
-        standard_keys = {"sensor_id", "timestamp"}
-        for key, value in data.items():
-            if key not in standard_keys and value is not None:
-                # Ensure value is of a type InfluxDB can ingest (str, float, int, bool)
-                if isinstance(value, (str, float, int, bool)):
-                    point.field(key, value)
-        
+        sensor_id = str(data.get("sensor_id", "unknown"))
+        prefix = self._validated_prefixes.get((topic, sensor_id))
+        if prefix is None:
+            if len(self._validated_prefixes) >= self.MAX_CACHED_PREFIXES:
+                self._validated_prefixes.clear()
+            prefix = "mqtt_messages" + _lp_tags(topic=topic, status="validated", sensor_id=sensor_id) + " "
+            self._validated_prefixes[(topic, sensor_id)] = prefix
 
+        if format_fields is not None:
+            line_fields = format_fields(data)
+            if line_fields is not None:
+                self.write_api.write(bucket=self.bucket, org=self.org, record=prefix + line_fields)
+                return
 
-        self.write_api.write(bucket=self.bucket, org=self.org, record=point)
+        fields = []
+        if field_keys is not None:
+            for key, key_eq in field_keys:
+                value = _lp_value(data.get(key))
+                if value is not None:
+                    fields.append(key_eq + value)
+        else:
+            # Dynamically add fields from the data payload
+            for key, value in data.items():
+                if key not in _STANDARD_KEYS and value is not None:
+                    # Only values InfluxDB can ingest (str, float, int, bool) are kept
+                    field = _lp_field(key, value)
+                    if field:
+                        fields.append(field)
 
-    def write_failed_data(self, topic, fail_report):
+        if fields: # A line without fields is not valid line protocol
+            self.write_api.write(bucket=self.bucket, org=self.org, record=prefix + ",".join(fields))
+
+    def write_failed_data(self, topic, fail_report, report_json=None):
+        """
+        Writes one small `mqtt_errors` point per error (tagged by type and
+        column, so errors can be queried without parsing JSON) plus a failed
+        `mqtt_messages` point with the error count. The whole report is only
+        stored as well when INFLUXDB_STORE_FULL_REPORT=1; `report_json` is the
+        already serialized report (bytes), if the caller has one.
+        """
         if not self.write_api:
             return
 
+        errors = fail_report.get("errors") or [{}]
         # Extract primary error for tagging
-        primary_error = fail_report.get("errors", [{}])[0]
+        primary_error = errors[0]
         error_type = primary_error.get("error_type", "unknown")
         error_column = primary_error.get("column", "unknown")
 
+        prefixes = self._failed_prefixes.get(topic)
+        if prefixes is None:
+            clean_sensor_id = topic.strip("/")
+            prefixes = (
+                "mqtt_messages" + _lp_tags(topic=topic, status="failed", sensor_id=clean_sensor_id),
+                "mqtt_errors" + _lp_tags(topic=topic, sensor_id=clean_sensor_id),
+            )
+            self._failed_prefixes[topic] = prefixes
+        message_prefix, error_prefix = prefixes
 
-        clean_sensor_id = topic.strip("/")
-
-        point = Point("mqtt_messages") \
-            .tag("topic", topic) \
-            .tag("status", "failed") \
-            .tag("sensor_id", clean_sensor_id) \
-            .tag("error_type", error_type) \
-            .tag("error_column", error_column) \
-            .field("full_error_report", json.dumps(fail_report))
-        
-        
-            
-        self.write_api.write(bucket=self.bucket, org=self.org, record=point)
+        fields = f"error_count={len(errors)}i"
+        if self.store_full_report:
+            if report_json is None:
+                report_json = dumps_clean(fail_report)
+            fields += "," + _lp_field("full_error_report", report_json.decode())
+        lines = [message_prefix + _lp_tags(error_type=error_type, error_column=error_column) + " " + fields]
+        for error in errors:
+            lines.append(
+                error_prefix + _lp_tags(error_type=error.get("error_type", "unknown"), column=error.get("column", "unknown"))
+                + " " + _lp_field("check", str(error.get("check", "")))
+                + "," + _lp_field("failure_case", str(error.get("failed_value")))
+            )
+        self.write_api.write(bucket=self.bucket, org=self.org, record=lines)
         
     def close(self):
         if self.client:
             print("[InfluxDB] Closing client and flushing writer...")
+            self.write_api.close() # Flushes any points still buffered
             self.client.close()
             print("[InfluxDB] Writer closed.")
 
+# One writer (and HTTP connection pool) for the whole process: MQTT client
+# restarts reuse it instead of tearing the connection down and rebuilding it.
+_shared_writer = None
+_shared_writer_lock = threading.Lock()
+
+def get_influx_writer():
+    """Returns the process-wide InfluxDBWriter, creating it on first use."""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = InfluxDBWriter()
+            atexit.register(_shared_writer.close) # Final flush when the process exits
+        return _shared_writer
+
 # Global variable to hold the MQTT client thread
 mqtt_thread = None
 stop_event = threading.Event()
 
+# Checks whose argument is a regular expression
+_REGEX_CHECKS = frozenset(("str_matches", "str_contains"))
+
+# Built checks are immutable, so columns with the same rule share one object
+_CHECK_CACHE = {} # (check name, JSON of its argument) -> pa.Check
+
+def _make_check(check_name, check_arg):
+    """Returns the pa.Check for a JSON check definition, or None if pa.Check has no such check."""
+    try:
+        key = (check_name, json.dumps(check_arg, sort_keys=True))
+    except TypeError:
+        key = None
+    check = _CHECK_CACHE.get(key) if key else None
+    if check is not None:
+        return check
+
+    # Regex checks get their pattern compiled once here; `error` keeps
+    # the rule text in failure reports the same as for a plain string.
+    if check_name in _REGEX_CHECKS and isinstance(check_arg, str):
+        check = getattr(pa.Check, check_name)(re.compile(check_arg), error=f"{check_name}('{check_arg}')")
+    # Ensure the check is a valid attribute of pa.Check
+    elif hasattr(pa.Check, check_name):
+        check = getattr(pa.Check, check_name)(check_arg)
+    else:
+        return None
+    if key:
+        _CHECK_CACHE[key] = check
+    return check
+
 def build_schema_from_json(schema_json: dict) -> pa.DataFrameSchema:
     """
     Dynamically builds a Pandera DataFrameSchema from a JSON definition.
@@ -138,9 +372,9 @@ def build_schema_from_json(schema_json: dict) -> pa.DataFrameSchema:
         # Checks are only relevant for non-datetime types in our UI
         if dtype_str != "datetime" and "checks" in col_props:
             for check_name, check_arg in col_props["checks"].items():
-                # Ensure the check is a valid attribute of pa.Check
-                if hasattr(pa.Check, check_name):
-                    checks.append(getattr(pa.Check, check_name)(check_arg))
+                check = _make_check(check_name, check_arg)
+                if check is not None:
+                    checks.append(check)
         
         columns[col_name] = pa.Column(
             dtype=dtype,
@@ -177,30 +411,307 @@ def build_schema_from_json(schema_json: dict) -> pa.DataFrameSchema:
     )
 
 def load_schema_from_file(path: str):
-    """Loads a schema from a JSON file and builds a Pandera schema."""
+    """
+    Loads a schema from a JSON file and builds a Pandera schema.
+    Returns a (schema, compiled) pair, where `compiled` is the schema's row
+    validator (see compile_row_validator) or None; (None, None) on failure.
+    Results are cached per file modification time, so restarting the MQTT
+    client only rebuilds schemas whose files actually changed.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        print(f"Error: Schema file not found at {path}")
+        return None, None
+    return _load_schema_cached(path, mtime)
+
+# Threads used to read and build schema files when the MQTT client starts
+SCHEMA_LOAD_WORKERS = 8
+
+def clear_schema_cache():
+    """Drops every cached schema and check, so the next load rebuilds them from disk."""
+    _load_schema_cached.cache_clear()
+    _CHECK_CACHE.clear()
+
+@functools.lru_cache(maxsize=128)
+def _load_schema_cached(path: str, mtime: int):
     try:
         with open(path, "r") as f:
             schema_definition = json.load(f)
-        return build_schema_from_json(schema_definition)
+        schema = build_schema_from_json(schema_definition)
+        return schema, compile_row_validator(schema)
     except FileNotFoundError:
         print(f"Error: Schema file not found at {path}")
-        return None
+        return None, None
     except json.JSONDecodeError:
         print(f"Error: Could not decode JSON from {path}")
-        return None
+        return None, None
     except Exception as e:
         print(f"An unexpected error occurred while loading schema from {path}: {e}")
+        return None, None
+
+_DUMPS_CLEAN_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def dumps_clean(obj) -> bytes:
+    """
+    Serializes a failure report to JSON bytes in a single pass. orjson writes
+    NaN (including numpy NaN) as null, and anything it can't encode natively
+    (e.g. pandas Timestamps) falls back to str().
+    """
+    return orjson.dumps(obj, default=str, option=_DUMPS_CLEAN_OPTIONS)
+
+# --- Fast single-row validation ---
+# Validating one MQTT payload with Pandera means building a one-row DataFrame
+# first, which costs far more than the checks themselves. For the common schema
+# features below, a row validator checks the parsed JSON dict directly. It only
+# ever answers "definitely valid": anything it rejects (or cannot express) is
+# still validated by Pandera, so error reports stay exactly the same.
+
+# Exact Python types Pandera accepts for a column dtype without coercion
+_ROW_DTYPE_TYPES = {"str": (str,), "float64": (float,), "int64": (int,), "bool": (bool,)}
+
+_ROW_COMPARE_CHECKS = {
+    "greater_than": ("min_value", ">"),
+    "greater_than_or_equal_to": ("min_value", ">="),
+    "less_than": ("max_value", "<"),
+    "less_than_or_equal_to": ("max_value", "<="),
+}
+_INT64_MIN, _INT64_MAX = -2**63, 2**63 - 1
+
+def _row_check_source(check, dtype_name, const):
+    """
+    Returns a Python expression over `v` that is true when the value FAILS the
+    Pandera check, or None if the check isn't supported. `const(value)` stores
+    a constant in the generated function's namespace and returns its name.
+    """
+    name, stats = check.name, check.statistics
+    numeric = dtype_name in ("float64", "int64")
+
+    if name in _ROW_COMPARE_CHECKS:
+        key, op = _ROW_COMPARE_CHECKS[name]
+        bound = stats.get(key)
+        if not numeric or type(bound) not in (int, float):
+            return None
+        return f"not (v {op} {const(bound)})"
+    if name in ("equal_to", "not_equal_to"):
+        value = stats.get("value")
+        if type(value) not in (str, int, float, bool):
+            return None
+        return f"not (v {'==' if name == 'equal_to' else '!='} {const(value)})"
+    if name in ("isin", "notin"):
+        values = stats.get("allowed_values" if name == "isin" else "forbidden_values")
+        try:
+            values = frozenset(values)
+        except TypeError:
+            return None
+        return f"v {'not in' if name == 'isin' else 'in'} {const(values)}"
+
+    if dtype_name != "str":
         return None
+    if name in ("str_matches", "str_contains"):
+        try:
+            pattern = re.compile(stats.get("pattern"))
+        except (TypeError, re.error):
+            return None
+        # pandas' str.match anchors at the start, str.contains searches anywhere
+        return f"{const(pattern.match if name == 'str_matches' else pattern.search)}(v) is None"
+    if name in ("str_startswith", "str_endswith"):
+        affix = stats.get("string")
+        if type(affix) is not str:
+            return None
+        return f"not v.{name[4:]}({const(affix)})"
+    return None
+
+def compile_row_validator(schema: pa.DataFrameSchema):
+    """
+    Compiles a Pandera schema into a function that takes a parsed JSON payload
+    and returns True only if Pandera would accept it as a one-row DataFrame.
+    Returns None if the schema uses features the row validator doesn't cover.
 
-def replace_nan_with_none(obj):
-    """Recursively walk a dict or list and replace float('nan') with None."""
-    if isinstance(obj, dict):
-        return {k: replace_nan_with_none(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [replace_nan_with_none(elem) for elem in obj]
-    elif isinstance(obj, float) and math.isnan(obj):
+    The schema is fixed for the lifetime of the client, so the function is
+    generated as straight-line Python source (one block per column) instead
+    of looping over a list of check objects on every message.
+    """
+    if (schema.strict not in (True, False) or schema.ordered or schema.index is not None
+            or schema.checks or schema.unique or schema.dtype is not None or schema.parsers
+            or schema.add_missing_columns or schema.drop_invalid_rows):
         return None
-    return obj
+
+    namespace = {}
+    def const(value):
+        name = f"_c{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    lines = ["def validate_row(data):", "    if type(data) is not dict: return False"]
+    if schema.strict:
+        lines.append(f"    if len(data) != {len(schema.columns)}: return False")
+
+    for col_name, column in schema.columns.items():
+        dtype_name = str(column.dtype)
+        if (dtype_name not in _ROW_DTYPE_TYPES or column.regex or not column.required
+                or column.parsers or type(col_name) is not str):
+            return None
+
+        types = _ROW_DTYPE_TYPES[dtype_name]
+        if column.coerce and dtype_name == "float64":
+            types = (float, int) # ints are coerced to floats losslessly
+        # Nulls and NaNs are left to Pandera, which knows about nullable columns
+        lines.append(f"    v = data.get({col_name!r})")
+        lines.append(f"    if v is None or v != v or type(v) not in {const(types)}: return False")
+        if dtype_name == "int64":
+            lines.append(f"    if not ({_INT64_MIN} <= v <= {_INT64_MAX}): return False")
+
+        for check in column.checks:
+            failed = _row_check_source(check, dtype_name, const)
+            if failed is None:
+                return None
+            lines.append(f"    if {failed}: return False")
+    lines.append("    return True")
+
+    exec(compile("\n".join(lines), f"<row validator {schema.name or ''}>", "exec"), namespace)
+    return namespace["validate_row"]
+
+def _compile_value_check(column, dtype_name):
+    """
+    Compiles a column's checks into a function of one non-null value that
+    returns True if it passes them all, or None if any check isn't supported.
+    """
+    namespace = {}
+    def const(value):
+        name = f"_c{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    fails = ["v != v"] # NaN
+    if dtype_name == "int64":
+        fails.append(f"not ({_INT64_MIN} <= v <= {_INT64_MAX})")
+    for check in column.checks:
+        failed = _row_check_source(check, dtype_name, const)
+        if failed is None:
+            return None
+        fails.append(f"({failed})")
+    exec(compile(f"def passes(v): return not ({' or '.join(fails)})", "<value check>", "exec"), namespace)
+    return namespace["passes"]
+
+# Payload shapes remembered per series validator before its cache starts over
+MAX_CACHED_SHAPES = 256
+
+def compile_series_validator(schema: pa.DataFrameSchema):
+    """
+    For schemas the row validator can't handle (e.g. datetime columns or
+    nullable values), builds one pa.SeriesSchema per column and returns a
+    function that validates a payload column by column on 1-element Series,
+    which is cheaper than building a DataFrame. Like the row validator it
+    only confirms valid payloads; returns None for unsupported schemas.
+
+    Columns whose checks the row validator understands are checked on the
+    value directly whenever the payload carries the exact Python type for
+    them. Which columns qualify depends only on the payload's shape (its
+    keys and value types), so that plan is worked out once per shape.
+    """
+    if (schema.ordered or schema.index is not None or schema.checks or schema.unique
+            or schema.dtype is not None or schema.parsers
+            or schema.add_missing_columns or schema.drop_invalid_rows):
+        return None
+
+    columns = []
+    for col_name, column in schema.columns.items():
+        if column.regex or not column.required or column.parsers:
+            return None
+        coerce = column.coerce or schema.coerce
+        series_schema = pa.SeriesSchema(
+            column.dtype,
+            checks=column.checks,
+            nullable=column.nullable,
+            coerce=coerce,
+            name=col_name
+        )
+        dtype_name = str(column.dtype)
+        types, passes = None, None
+        if dtype_name in _ROW_DTYPE_TYPES:
+            passes = _compile_value_check(column, dtype_name)
+            types = (float, int) if coerce and dtype_name == "float64" else _ROW_DTYPE_TYPES[dtype_name]
+        columns.append((col_name, types, passes, series_schema))
+
+    names = frozenset(schema.columns)
+    strict = schema.strict is True
+    plans = {} # (keys, value types) -> ((column, value check or None, SeriesSchema), ...) or None
+
+    def plan_for(data):
+        if not names <= data.keys() or (strict and len(data) != len(names)):
+            return None
+        return tuple(
+            (col_name, passes if passes is not None and type(data[col_name]) in types else None, series_schema)
+            for col_name, types, passes, series_schema in columns
+        )
+
+    def validate_series(data):
+        if type(data) is not dict:
+            return False
+        shape = (tuple(data), tuple(map(type, data.values())))
+        try:
+            plan = plans[shape]
+        except KeyError:
+            if len(plans) >= MAX_CACHED_SHAPES:
+                plans.clear()
+            plan = plans[shape] = plan_for(data)
+        if plan is None:
+            return False
+        for col_name, passes, series_schema in plan:
+            if passes is not None:
+                if not passes(data[col_name]):
+                    return False
+                continue
+            try:
+                series_schema.validate(pd.Series([data[col_name]], name=col_name))
+            except Exception: # Let the DataFrame validation give the authoritative answer
+                return False
+        return True
+
+    return validate_series
+
+# Built-in checks that look at the whole column rather than each value
+_CROSS_ROW_CHECKS = frozenset(("unique_values_eq",))
+
+def schema_is_batchable(schema: pa.DataFrameSchema) -> bool:
+    """
+    True if validating several payloads as one DataFrame gives each row the
+    same result as validating it on its own, i.e. no check looks across rows.
+    """
+    if (schema is None or schema.checks or schema.unique or schema.index is not None
+            or schema.drop_invalid_rows):
+        return False
+    for column in schema.columns.values():
+        if column.unique or any(check.name in _CROSS_ROW_CHECKS for check in column.checks):
+            return False
+    return True
+
+def rows_to_frame(rows):
+    """
+    Builds the DataFrame Pandera validates from parsed payloads. Same-shape
+    dicts are laid out column by column, which skips the per-record key
+    matching of pd.DataFrame(rows) but infers exactly the same dtypes.
+    """
+    first = rows[0]
+    if type(first) is dict and first:
+        return pd.DataFrame({key: [row[key] for row in rows] for key in first})
+    return pd.DataFrame(rows)
+
+class TopicContext:
+    """
+    Everything the handlers need for one subscribed topic, resolved once in
+    MQTTClient.start() so a message costs a single dict lookup.
+    """
+    __slots__ = (
+        "topic", "handler", "label", "schema_path", "schema",
+        "row_validator", "series_validator", "field_keys", "lp_format",
+        "validated_topic", "failed_topic", "batchable",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
 
 class MQTTClient:
     def __init__(self, broker, port, topic_mappings, actuator_mappings, influx_writer):
@@ -210,13 +721,119 @@ class MQTTClient:
         self.actuator_mappings = {mapping['actuator_id']: mapping for mapping in actuator_mappings} # New: Store actuator mappings
         self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.client.on_connect = self.on_connect
-        self.client.on_message = self.on_message
+        # No catch-all on_message: each subscribed topic gets its own callback
+        # (see _make_topic_cb), and paho drops anything that matches none.
         self.schemas = {}
+        self.compiled_schemas = {} # schema path -> compiled row validator (fast path)
+        self.field_keys = {} # schema path -> InfluxDB field keys, for strict schemas only
+        self.series_validators = {} # schema path -> per-column SeriesSchema validator
+        self.lp_formatters = {} # schema path -> line protocol field formatter (fast path only)
+        self.topic_ctx = {} # subscribed topic -> TopicContext
         self.influx_writer = influx_writer # Store the writer instance
+        # Validation, re-publishing and metric updates run on worker threads,
+        # off the network thread. Work is sharded by topic: each worker drains
+        # its own queue and a topic always goes to the same one, so messages of
+        # one topic are handled in the order they arrived. Batched topics (see
+        # _add_to_batch) are the exception: their rows are published when the
+        # batch is validated, so they keep their order only among payloads of
+        # the same shape. paho's publish() is thread-safe.
+        self.num_workers = os.cpu_count() or 1
+        self._shards = [queue.Queue(maxsize=WORK_QUEUE_SIZE) for _ in range(self.num_workers)]
+
+        # Bound Prometheus children, so flushes and state updates skip .labels()
+        # (a lock plus label validation) for label combinations already seen.
+        # The configured sensors and actuators are bound up front.
+        self._children = {}
+        for source_topic in self.topic_mappings:
+            sensor_id = source_topic.strip("/")
+            for status, error_type in (('validated', 'none'), ('failed', 'json_decode_error'), ('failed', 'unexpected_exception')):
+                self._metric_child(MESSAGES_PROCESSED, status, sensor_id, error_type)
+        for actuator_id in self.actuator_mappings:
+            self._metric_child(ACTUATOR_MESSAGES_PROCESSED, 'status', 'validated', actuator_id, 'none')
+            for message_type in ('command', 'status'):
+                for error_type in ('json_decode_error', 'unexpected_exception'):
+                    self._metric_child(ACTUATOR_MESSAGES_PROCESSED, message_type, 'failed', actuator_id, error_type)
+        # Handlers add to this buffer; a flusher thread applies the totals to
+        # the Prometheus counters every METRICS_FLUSH_INTERVAL seconds.
+        self._metric_buf = collections.defaultdict(int)
+        self._metric_lock = threading.Lock()
+        self._flushers_stop = threading.Event()
+        # (topic, keys, value types) -> [TopicContext, [(payload, data), ...]] awaiting Pandera
+        self._batches = {}
+        self._batch_lock = threading.Lock()
+
+    def _metric_child(self, metric, *label_values):
+        """Returns the child of `metric` for these label values (in label order), binding it once."""
+        key = (metric, label_values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*label_values)
+        return child
+
+    def _count(self, metric, *label_values):
+        """Records one increment of `metric` for these label values (applied on the next flush)."""
+        with self._metric_lock:
+            self._metric_buf[(metric, label_values)] += 1
+
+    def _flush_metrics(self):
+        with self._metric_lock:
+            if not self._metric_buf:
+                return
+            buf, self._metric_buf = self._metric_buf, collections.defaultdict(int)
+        for (metric, label_values), amount in buf.items():
+            self._metric_child(metric, *label_values).inc(amount)
+
+    def _metrics_flusher(self):
+        while not self._flushers_stop.wait(METRICS_FLUSH_INTERVAL):
+            self._flush_metrics()
+
+    def _validate(self, ctx, data):
+        """
+        Validates a single parsed payload, raising SchemaErrors if it is invalid.
+        Returns True if the compiled row validator accepted it (so every column
+        has its exact dtype), False if Pandera did.
+        The fast validators are tried first; Pandera only runs on a one-row
+        DataFrame when they can't confirm the payload (and to build the error
+        report).
+        """
+        exact = self._fast_validate(ctx, data)
+        if exact is None:
+            exact = self._validate_with_pandera(ctx, data)
+        return exact
+
+    def _fast_validate(self, ctx, data):
+        """
+        Returns True if the compiled row validator confirms the payload, False
+        if the series validator does, and None if neither can.
+        """
+        if ctx.row_validator is not None:
+            return True if ctx.row_validator(data) else None
+        if ctx.series_validator is not None and ctx.series_validator(data):
+            return False
+        return None
+
+    def _validate_with_pandera(self, ctx, data):
+        schema = ctx.schema
+        df = rows_to_frame((data,))
+        if ctx.row_validator is not None or ctx.series_validator is not None:
+            # Most likely invalid: collect every error for the report right away
+            schema.validate(df, lazy=True)
+            return False
+
+        # No fast path for this schema: fail fast on the first error, and only
+        # re-run lazily to gather the full error set when the payload is invalid.
+        try:
+            schema.validate(df, lazy=False)
+        except SchemaError:
+            schema.validate(df, lazy=True)
+        return False
 
     def on_connect(self, client, userdata, flags, rc, props):
         if rc == 0:
             print("[MQTT] Connected successfully.")
+            for topic, ctx in self.topic_ctx.items():
+                client.message_callback_add(topic, self._make_topic_cb(ctx))
+
             # Subscribe to all source topics from the sensor mappings
             for source_topic in self.topic_mappings.keys():
                 client.subscribe(source_topic)
@@ -236,235 +853,317 @@ class MQTTClient:
         else:
             print(f"[MQTT] Failed to connect, return code {rc}")
 
-    def on_message(self, client, userdata, msg):
+    def _make_topic_cb(self, ctx):
         """
-        Main message router. Determines the message type based on the topic
-        and delegates to the appropriate handler.
+        Builds the message callback for one topic. It only queues the payload
+        for the topic's handler on the topic's shard, so paho's network thread
+        never waits on validation. When the shard's worker falls behind and
+        its queue is full, the oldest queued message is dropped (and counted)
+        to make room.
         """
-        topic = msg.topic
-        payload = msg.payload.decode()
+        shard = self._shard_of(ctx.topic)
+        work, handler, shard_label = self._shards[shard], ctx.handler, str(shard)
 
-        # Check if it's a sensor message
-        if topic in self.topic_mappings:
-            self._handle_sensor_message(client, topic, payload, self.topic_mappings[topic])
-            return
+        def on_topic_message(client, userdata, msg):
+            item = (handler, ctx, msg.payload)
+            try:
+                work.put_nowait(item)
+            except queue.Full:
+                try:
+                    dropped = work.get_nowait()
+                except queue.Empty: # The workers caught up in the meantime
+                    pass
+                else:
+                    self._count(MESSAGES_DROPPED, shard_label, dropped[1].topic)
+                # This callback is the only producer, so there is room now
+                work.put_nowait(item)
 
-        # Check if it's an actuator command or status message
-        for mapping in self.actuator_mappings.values():
-            if topic == mapping.get("command_topic"):
-                self._handle_actuator_command(client, topic, payload, mapping)
-                return
-            if topic == mapping.get("status_topic"):
-                self._handle_actuator_status(client, topic, payload, mapping)
+        return on_topic_message
+
+    def _shard_of(self, topic):
+        """Returns the index of the worker that handles every message of `topic`."""
+        return hash(topic) % self.num_workers
+
+    def _worker(self, work):
+        """Runs one shard's queued messages through their handlers until it gets the None sentinel."""
+        client = self.client
+        while True:
+            item = work.get()
+            if item is None:
                 return
-        
-   
+            handler, ctx, payload = item
+            # This thread is the only one serving its shard's topics, so an
+            # error must not end it
+            try:
+                handler(client, ctx, payload)
+            except Exception as e:
+                logger.error("[ERROR] An unexpected error occurred while handling a message from %s: %s", ctx.topic, e)
 
-    def _handle_sensor_message(self, client, topic, payload, mapping):
-        """Handles incoming data from a sensor."""
-        source_topic = topic # For clarity
+    def _handle_sensor_message(self, client, ctx, payload):
+        """
+        Handles incoming data from a sensor. `payload` is the raw message
+        bytes; valid messages are re-published exactly as received.
+        """
+        source_topic = ctx.topic
         try:
-            data = json.loads(payload)
-            df = pd.DataFrame([data])
+            data = orjson.loads(payload)
             
-            schema_path = mapping.get("schema")
-            if not schema_path:
-                # If no schema is defined for the mapping, consider it valid
-                client.publish(mapping["validated"], payload, retain=False)
-                print(f"[NO-SCHEMA-VALID] {source_topic} -> {mapping['validated']}")
-                # Write to InfluxDB
-                self.influx_writer.write_validated_data(source_topic, data)
-                # Increment Prometheus counter
-                MESSAGES_PROCESSED.labels(
-                    status='validated', 
-                    sensor_id=data.get("sensor_id", "unknown"),
-                    error_type='none'
-                ).inc()
-                return
-
-            schema = self.schemas.get(schema_path) # Get schema by path, not topic
+            schema = ctx.schema
             if not schema:
-                print(f"[MQTT] Schema '{schema_path}' not loaded for topic {source_topic}. Skipping validation.")
-                # Optionally, treat as valid if schema file is missing or failed to load
-                client.publish(mapping["validated"], payload, retain=False)
-                # Write to InfluxDB
+                if ctx.schema_path:
+                    logger.warning("[MQTT] Schema '%s' not loaded for topic %s. Skipping validation.", ctx.schema_path, source_topic)
+                    # Optionally, treat as valid if schema file is missing or failed to load
+                else:
+                    # If no schema is defined for the mapping, consider it valid
+                    logger.info("[NO-SCHEMA-VALID] %s -> %s", source_topic, ctx.validated_topic)
+                client.publish(ctx.validated_topic, payload, retain=False)
+                # Write to InfluxDB (only the parsed payload tells which fields there are)
                 self.influx_writer.write_validated_data(source_topic, data)
                 # Increment Prometheus counter
-                MESSAGES_PROCESSED.labels(
-                    status='validated', 
-                    sensor_id=data.get("sensor_id", "unknown"),
-                    error_type='none'
-                ).inc()
+                self._count(MESSAGES_PROCESSED, 'validated', str(data.get("sensor_id", "unknown")), 'none')
                 return
 
-            schema.validate(df, lazy=True)
-            client.publish(mapping["validated"], payload, retain=False)
-            print(f"[VALID] {source_topic} -> {mapping['validated']}")
-            # Write to InfluxDB
-            self.influx_writer.write_validated_data(source_topic, data)
-            # Increment Prometheus counter
-            MESSAGES_PROCESSED.labels(
-                status='validated',
-                sensor_id=data.get("sensor_id", "unknown"),
-                error_type='none'
-            ).inc()
-
-        except json.JSONDecodeError:
-            print(f"[ERROR] Could not decode JSON from {source_topic}")
+            exact = self._fast_validate(ctx, data)
+            if exact is None:
+                if ctx.batchable and type(data) is dict:
+                    # Pandera is needed: validate it together with its neighbours
+                    self._add_to_batch(ctx, payload, data)
+                    return
+                exact = self._validate_with_pandera(ctx, data)
+            self._publish_valid_sensor(client, ctx, payload, data, exact)
+
+        except orjson.JSONDecodeError:
+            logger.error("[ERROR] Could not decode JSON from %s", source_topic)
             # Increment Prometheus counter for a specific error type
-            MESSAGES_PROCESSED.labels(
-                status='failed',
-                sensor_id=source_topic.strip("/"),
-                error_type='json_decode_error'
-            ).inc()
+            self._count(MESSAGES_PROCESSED, 'failed', ctx.label, 'json_decode_error')
         except SchemaErrors as e:
-            errors = parse_pandera_errors(e)
-            original_payload_data = json.loads(payload)
-            fail_msg = {"sensor": source_topic.strip("/"), "errors": errors, "original_payload": original_payload_data}
-            
-            # Clean the message of any NaN values before publishing
-            cleaned_fail_msg = replace_nan_with_none(fail_msg)
-
-            client.publish(mapping["failed"], json.dumps(cleaned_fail_msg), retain=False)
-            print(f"[INVALID] {source_topic} -> {mapping['failed']}")
-            # Write to InfluxDB
-            self.influx_writer.write_failed_data(source_topic, cleaned_fail_msg)
-            
-            # Increment Prometheus counter FOR EACH error found
-            for error in cleaned_fail_msg.get("errors", []):
-                MESSAGES_PROCESSED.labels(
-                    status='failed',
-                    sensor_id=cleaned_fail_msg.get("sensor", "unknown"),
-                    error_type=error.get('error_type', 'unknown_schema_error')
-                ).inc()
-                
+            self._publish_failed_sensor(client, ctx, data, parse_pandera_errors(e))
         except Exception as e:
-            print(f"[ERROR] An unexpected error occurred in on_message: {e}")
+            logger.error("[ERROR] An unexpected error occurred in _handle_sensor_message: %s", e)
             # Increment Prometheus counter for unexpected errors
-            MESSAGES_PROCESSED.labels(
-                status='failed',
-                sensor_id=source_topic.strip("/"),
-                error_type='unexpected_exception'
-            ).inc()
-
-    def _handle_actuator_command(self, client, topic, payload, mapping):
-        """Validates a command and re-publishes it to the validated or failed topic."""
+            self._count(MESSAGES_PROCESSED, 'failed', ctx.label, 'unexpected_exception')
+
+    def _publish_valid_sensor(self, client, ctx, payload, data, exact):
+        """Re-publishes a valid sensor payload and records it. `exact` is _validate()'s result."""
+        client.publish(ctx.validated_topic, payload, retain=False)
+        logger.info("[VALID] %s -> %s", ctx.topic, ctx.validated_topic)
+        # Write to InfluxDB
+        self.influx_writer.write_validated_data(ctx.topic, data, ctx.field_keys, ctx.lp_format if exact else None)
+        # Increment Prometheus counter
+        self._count(MESSAGES_PROCESSED, 'validated', str(data.get("sensor_id", "unknown")), 'none')
+
+    def _publish_failed_sensor(self, client, ctx, data, errors):
+        """Publishes the failure report for an invalid sensor payload and records it."""
+        fail_msg = {"sensor": ctx.label, "errors": errors, "original_payload": data}
+        
+        # Serialized once (NaN -> null) and reused for MQTT and InfluxDB
+        fail_json = dumps_clean(fail_msg)
+
+        client.publish(ctx.failed_topic, fail_json, retain=False)
+        logger.info("[INVALID] %s -> %s", ctx.topic, ctx.failed_topic)
+        # Write to InfluxDB
+        self.influx_writer.write_failed_data(ctx.topic, fail_msg, fail_json)
+        
+        # Increment Prometheus counter FOR EACH error found
+        for error in errors:
+            self._count(MESSAGES_PROCESSED, 'failed', ctx.label, error.get('error_type', 'unknown_schema_error'))
+
+    def _add_to_batch(self, ctx, payload, data):
+        """
+        Queues a sensor payload for batched Pandera validation. Batches are
+        keyed by topic and payload shape (keys and value types), so pandas
+        infers the same column dtypes for the batch as for each row alone.
+        Rows are published in arrival order within a batch, but batches of
+        different shapes are flushed independently (up to BATCH_FLUSH_INTERVAL
+        later), and payloads that aren't batched are handled right away, so a
+        topic's messages of different shapes may be published out of order.
+        """
+        key = (ctx.topic, tuple(data), tuple(map(type, data.values())))
+        with self._batch_lock:
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = self._batches[key] = [ctx, []]
+            batch[1].append((payload, data))
+            if len(batch[1]) < BATCH_MAX_ROWS:
+                return
+            del self._batches[key]
+        self._validate_batch(*batch)
+
+    def _flush_batches(self):
+        with self._batch_lock:
+            if not self._batches:
+                return
+            batches, self._batches = self._batches, {}
+        for ctx, rows in batches.values():
+            self._validate_batch(ctx, rows)
+
+    def _batch_flusher(self):
+        while not self._flushers_stop.wait(BATCH_FLUSH_INTERVAL):
+            self._flush_batches()
+        self._flush_batches() # Whatever the last messages left behind
+
+    def _validate_batch(self, ctx, rows):
+        """
+        Validates one batch of same-shape payloads as a single DataFrame and
+        routes every row to the validated or failed topic. Rows that fail are
+        validated again on their own, so their error reports are exactly what
+        single-message validation produces.
+        """
+        client = self.client
         try:
-            data = json.loads(payload)
-            df = pd.DataFrame([data])
-            
-            schema_path = mapping.get("command_schema")
-            schema = self.schemas.get(schema_path)
+            try:
+                ctx.schema.validate(rows_to_frame([data for _, data in rows]), lazy=True)
+                failed_rows = ()
+            except SchemaErrors as e:
+                row_index = e.failure_cases["index"]
+                # Failures without a row (a missing or extra column, a wrong
+                # column dtype) hit every row, since they all share a shape
+                failed_rows = range(len(rows)) if row_index.isna().any() else set(row_index)
 
-            if not schema:
-                print(f"[ERROR] Command schema not found: {schema_path}")
+            for i, (payload, data) in enumerate(rows):
+                if i in failed_rows:
+                    try:
+                        self._validate_with_pandera(ctx, data)
+                    except SchemaErrors as e:
+                        self._publish_failed_sensor(client, ctx, data, parse_pandera_errors(e))
+                        continue
+                self._publish_valid_sensor(client, ctx, payload, data, False)
+        except Exception as e:
+            logger.error("[ERROR] An unexpected error occurred while validating a batch from %s: %s", ctx.topic, e)
+            for _ in rows:
+                self._count(MESSAGES_PROCESSED, 'failed', ctx.label, 'unexpected_exception')
+
+    def _handle_actuator_command(self, client, ctx, payload):
+        """
+        Validates a command and re-publishes it to the validated or failed
+        topic. `payload` stays raw bytes; it's only decoded for the report
+        when it isn't valid JSON.
+        """
+        topic = ctx.topic
+        try:
+            data = orjson.loads(payload)
+            
+            if not ctx.schema:
+                logger.error("[ERROR] Command schema not found: %s", ctx.schema_path)
                 # Potentially publish to a generic error topic if needed
                 return
 
-            schema.validate(df, lazy=True)
+            self._validate(ctx, data)
             
             # Re-publish to the VALIDATED command topic
-            validated_topic = mapping.get("command_validated_topic")
+            validated_topic = ctx.validated_topic
             client.publish(validated_topic, payload, retain=False)
-            print(f"[CMD_VALID] {topic} -> {validated_topic}")
+            logger.info("[CMD_VALID] %s -> %s", topic, validated_topic)
 
-        except (json.JSONDecodeError, SchemaErrors) as e:
-            failed_topic = mapping.get("command_failed_topic")
-            error_report = {}
-            actuator_id = mapping.get("actuator_id", "unknown")
-            
-            if isinstance(e, json.JSONDecodeError):
-                print(f"[CMD_INVALID] JSON Error on {topic}: {e}")
-                error_report = {"error_type": "json_decode_error", "reason": str(e), "original_payload": payload}
-                # Increment Prometheus counter for JSON error
-                ACTUATOR_MESSAGES_PROCESSED.labels(
-                    type='command', status='failed', actuator_id=actuator_id, error_type='json_decode_error'
-                ).inc()
-            else: # SchemaErrors
-                print(f"[CMD_INVALID] Schema Error on {topic}")
-                errors = parse_pandera_errors(e)
-                original_payload_data = json.loads(payload)
-                error_report = {"actuator_id": actuator_id, "errors": errors, "original_payload": original_payload_data}
-                # Increment Prometheus counter for each schema error
-                for error in errors:
-                    ACTUATOR_MESSAGES_PROCESSED.labels(
-                        type='command', status='failed', actuator_id=actuator_id, error_type=error.get('error_type', 'unknown')
-                    ).inc()
-
-            client.publish(failed_topic, json.dumps(error_report), retain=False)
-            print(f"[CMD_INVALID] {topic} -> {failed_topic}")
+        except orjson.JSONDecodeError as e:
+            self._publish_failed_actuator(client, ctx, 'command', payload, e)
+        except SchemaErrors as e:
+            self._publish_failed_actuator(client, ctx, 'command', payload, e, data)
         except Exception as e:
-            print(f"[ERROR] Unexpected error in _handle_actuator_command: {e}")
-            actuator_id = mapping.get("actuator_id", "unknown")
-            ACTUATOR_MESSAGES_PROCESSED.labels(
-                type='command', status='failed', actuator_id=actuator_id, error_type='unexpected_exception'
-            ).inc()
+            logger.error("[ERROR] Unexpected error in _handle_actuator_command: %s", e)
+            self._count(ACTUATOR_MESSAGES_PROCESSED, 'command', 'failed', ctx.label, 'unexpected_exception')
 
 
-    def _handle_actuator_status(self, client, topic, payload, mapping):
-        """Validates a status message and re-publishes it, updating metrics."""
+    def _handle_actuator_status(self, client, ctx, payload):
+        """Validates a status message (raw bytes) and re-publishes it, updating metrics."""
+        topic = ctx.topic
         try:
-            data = json.loads(payload)
-            df = pd.DataFrame([data])
+            data = orjson.loads(payload)
             
-            schema_path = mapping.get("status_schema")
-            schema = self.schemas.get(schema_path)
-
-            if not schema:
-                print(f"[ERROR] Status schema not found: {schema_path}")
+            if not ctx.schema:
+                logger.error("[ERROR] Status schema not found: %s", ctx.schema_path)
                 return
 
-            validated_df = schema.validate(df, lazy=True)
+            self._validate(ctx, data)
             
             # Re-publish to the VALIDATED status topic
-            validated_topic = mapping.get("status_validated_topic")
+            validated_topic = ctx.validated_topic
             client.publish(validated_topic, payload, retain=False)
-            print(f"[STATUS_VALID] {topic} -> {validated_topic}")
+            logger.info("[STATUS_VALID] %s -> %s", topic, validated_topic)
             
             # Update Prometheus Enum metric with new labels
-            actuator_id = data.get("actuator_id", "unknown")
+            actuator_id = str(data.get("actuator_id", "unknown"))
             room = data.get("room", "default")
             state = data.get("status", "unknown") # e.g., 'off', 'blue'
             
             # Set the Enum state
-            ACTUATOR_STATE.labels(actuator_id=actuator_id, room=room).state(state)
+            self._metric_child(ACTUATOR_STATE, actuator_id, str(room)).state(state)
             
             # Increment success counter
-            ACTUATOR_MESSAGES_PROCESSED.labels(
-                type='status', status='validated', actuator_id=actuator_id, error_type='none'
-            ).inc()
+            self._count(ACTUATOR_MESSAGES_PROCESSED, 'status', 'validated', actuator_id, 'none')
             
 
-        except (json.JSONDecodeError, SchemaErrors) as e:
-            failed_topic = mapping.get("status_failed_topic")
-            error_report = {}
-            actuator_id = mapping.get("actuator_id", "unknown")
-            
-            if isinstance(e, json.JSONDecodeError):
-                print(f"[STATUS_INVALID] JSON Error on {topic}: {e}")
-                error_report = {"error_type": "json_decode_error", "reason": str(e), "original_payload": payload}
-                ACTUATOR_MESSAGES_PROCESSED.labels(
-                    type='status', status='failed', actuator_id=actuator_id, error_type='json_decode_error'
-                ).inc()
-            else: # SchemaErrors
-                print(f"[STATUS_INVALID] Schema Error on {topic}")
-                errors = parse_pandera_errors(e)
-                original_payload_data = json.loads(payload)
-                error_report = {"actuator_id": actuator_id, "errors": errors, "original_payload": original_payload_data}
-                # Increment for each error
-                for error in errors:
-                    ACTUATOR_MESSAGES_PROCESSED.labels(
-                        type='status', status='failed', actuator_id=actuator_id, error_type=error.get('error_type', 'unknown')
-                    ).inc()
-
-            client.publish(failed_topic, json.dumps(error_report), retain=False)
-            print(f"[STATUS_INVALID] {topic} -> {failed_topic}")
+        except orjson.JSONDecodeError as e:
+            self._publish_failed_actuator(client, ctx, 'status', payload, e)
+        except SchemaErrors as e:
+            self._publish_failed_actuator(client, ctx, 'status', payload, e, data)
         except Exception as e:
-            print(f"[ERROR] Unexpected error in _handle_actuator_status: {e}")
+            logger.error("[ERROR] Unexpected error in _handle_actuator_status: %s", e)
+            self._count(ACTUATOR_MESSAGES_PROCESSED, 'status', 'failed', ctx.label, 'unexpected_exception')
+
+    def _publish_failed_actuator(self, client, ctx, kind, payload, e, data=None):
+        """
+        Publishes the failure report for an invalid actuator `kind` ('command'
+        or 'status') message and records it. `e` is the JSONDecodeError or
+        SchemaErrors raised for it; `data` is the parsed payload, if any.
+        """
+        tag = "CMD_INVALID" if kind == "command" else "STATUS_INVALID"
+        topic, actuator_id = ctx.topic, ctx.label
+
+        if isinstance(e, orjson.JSONDecodeError):
+            logger.info("[%s] JSON Error on %s: %s", tag, topic, e)
+            error_report = {"error_type": "json_decode_error", "reason": str(e), "original_payload": payload.decode(errors="replace")}
+            # Increment Prometheus counter for JSON error
+            self._count(ACTUATOR_MESSAGES_PROCESSED, kind, 'failed', actuator_id, 'json_decode_error')
+        else: # SchemaErrors
+            logger.info("[%s] Schema Error on %s", tag, topic)
+            errors = parse_pandera_errors(e)
+            error_report = {"actuator_id": actuator_id, "errors": errors, "original_payload": data}
+            # Increment Prometheus counter for each schema error
+            for error in errors:
+                self._count(ACTUATOR_MESSAGES_PROCESSED, kind, 'failed', actuator_id, error.get('error_type', 'unknown'))
+
+        client.publish(ctx.failed_topic, dumps_clean(error_report), retain=False)
+        logger.info("[%s] %s -> %s", tag, topic, ctx.failed_topic)
+
+    def _topic_context(self, topic, handler, label, schema_path, validated_topic, failed_topic):
+        return TopicContext(
+            topic=topic, handler=handler, label=label,
+            schema_path=schema_path, schema=self.schemas.get(schema_path),
+            row_validator=self.compiled_schemas.get(schema_path),
+            series_validator=self.series_validators.get(schema_path),
+            field_keys=self.field_keys.get(schema_path),
+            lp_format=self.lp_formatters.get(schema_path),
+            validated_topic=validated_topic, failed_topic=failed_topic,
+            # Messages the fast validators reject are nearly always invalid, and
+            # those are validated alone anyway (for their own error report)
+            batchable=(schema_path not in self.compiled_schemas and schema_path not in self.series_validators
+                       and schema_is_batchable(self.schemas.get(schema_path))),
+        )
+
+    def _build_topic_contexts(self):
+        """Resolves every subscribed topic's mapping, schema and validators into a TopicContext."""
+        self.topic_ctx = {}
+        # Filled in reverse precedence so that, when mappings share a topic, the
+        # first one wins: sensors, then each actuator's command and status
+        for mapping in reversed(list(self.actuator_mappings.values())):
             actuator_id = mapping.get("actuator_id", "unknown")
-            ACTUATOR_MESSAGES_PROCESSED.labels(
-                type='status', status='failed', actuator_id=actuator_id, error_type='unexpected_exception'
-            ).inc()
+            if mapping.get("status_topic"):
+                self.topic_ctx[mapping["status_topic"]] = self._topic_context(
+                    mapping["status_topic"], self._handle_actuator_status, actuator_id,
+                    mapping.get("status_schema"), mapping.get("status_validated_topic"), mapping.get("status_failed_topic"),
+                )
+            if mapping.get("command_topic"):
+                self.topic_ctx[mapping["command_topic"]] = self._topic_context(
+                    mapping["command_topic"], self._handle_actuator_command, actuator_id,
+                    mapping.get("command_schema"), mapping.get("command_validated_topic"), mapping.get("command_failed_topic"),
+                )
+        for source_topic, mapping in self.topic_mappings.items():
+            sensor_id = source_topic.strip("/")
+            self.topic_ctx[source_topic] = self._topic_context(
+                source_topic, self._handle_sensor_message, sensor_id,
+                mapping.get("schema"), mapping["validated"], mapping["failed"],
+            )
 
     def start(self):
         global stop_event
@@ -478,29 +1177,72 @@ class MQTTClient:
         
         unique_schema_paths = sensor_schema_paths.union(actuator_cmd_schema_paths, actuator_status_schema_paths)
 
-        for path in unique_schema_paths:
-            if path: # Ensure path is not empty
-                schema = load_schema_from_file(path)
+        paths = sorted(path for path in unique_schema_paths if path) # Ensure path is not empty
+        # Files are read and parsed in parallel; results are stored here, in path order
+        with ThreadPoolExecutor(max_workers=SCHEMA_LOAD_WORKERS) as pool:
+            loaded = list(pool.map(load_schema_from_file, paths))
+
+        for path, (schema, compiled) in zip(paths, loaded):
             if schema:
                 self.schemas[path] = schema # Store schema by its path
-                print(f"  - Loaded schema from {path}")
+                if compiled:
+                    self.compiled_schemas[path] = compiled
+                    format_fields = compile_lp_formatter(schema)
+                    if format_fields:
+                        self.lp_formatters[path] = format_fields
+                else:
+                    validate_series = compile_series_validator(schema)
+                    if validate_series:
+                        self.series_validators[path] = validate_series
+                if schema.strict is True: # A valid payload has exactly the schema's columns
+                    self.field_keys[path] = lp_field_keys(schema.columns)
+                print(f"  - Loaded schema from {path}{' (fast path)' if compiled else ''}")
+
+        self._build_topic_contexts()
         
         print(f"[MQTT] Connecting to {self.broker}:{self.port}...")
         self.client.connect(self.broker, self.port, 60)
         
-        while not stop_event.is_set():
-            self.client.loop(timeout=1.0)
+        self._flushers_stop.clear()
+        flushers = [
+            threading.Thread(target=self._batch_flusher, name="mqtt-batches", daemon=True),
+            threading.Thread(target=self._metrics_flusher, name="mqtt-metrics", daemon=True),
+        ]
+        for flusher in flushers:
+            flusher.start()
+        workers = [
+            threading.Thread(target=self._worker, args=(work,), name=f"mqtt-worker-{i}", daemon=True)
+            for i, work in enumerate(self._shards)
+        ]
+        for worker in workers:
+            worker.start()
+
+        # paho runs the network loop (and the message callbacks) in its own
+        # thread; this thread just waits until it is asked to stop.
+        self.client.loop_start()
+        stop_event.wait()
         
-        print("[MQTT] Loop stopped.")
-        self.influx_writer.close() # <-- ADD THIS LINE
         self.client.disconnect()
+        self.client.loop_stop()
+        # Let queued and in-flight messages finish, then stop the workers
+        for work in self._shards:
+            work.put(None)
+        for worker in workers:
+            worker.join()
+        self._flushers_stop.set() # The batch flusher validates what's left first
+        for flusher in flushers:
+            flusher.join()
+        self._flush_metrics() # Whatever the last messages counted
+        print("[MQTT] Loop stopped.")
+        # The shared InfluxDB writer stays open across restarts; its batch is
+        # flushed on its own interval and closed at process exit.
         print("[MQTT] Disconnected.")
 
 def start_mqtt_client():
     global mqtt_thread
     
     from main import read_config, read_actuator_config # Local import to avoid circular dependency
-    config = read_config()
+    config = read_config(copy=False) # Only read; the mappings are never modified here
     actuator_config = read_actuator_config() # New: Read actuator config
 
     mqtt_settings = config.get("mqtt_settings", {})
@@ -514,8 +1256,8 @@ def start_mqtt_client():
         print("[MQTT] No sensor or actuator mappings configured. MQTT client not starting.")
         return
 
-    # Create an instance of the InfluxDB writer
-    influx_writer = InfluxDBWriter()
+    # Reuse the process-wide InfluxDB writer
+    influx_writer = get_influx_writer()
 
     client_instance = MQTTClient(
         broker=mqtt_settings["broker"],
@@ -548,8 +1290,15 @@ def stop_mqtt_client():
     
     mqtt_thread = None
 
-def restart_mqtt_client():
+def restart_mqtt_client(schemas_changed=False):
+    """
+    Restarts the client with the current configuration. Pass schemas_changed=True
+    after editing or deleting schema files: the mtime-keyed schema cache can miss
+    two writes within the filesystem's timestamp resolution.
+    """
     stop_mqtt_client()
+    if schemas_changed:
+        clear_schema_cache()
     print("[MQTT] Restarting client...")
     time.sleep(1) # Give a moment for resources to be released
     start_mqtt_client() 
\ No newline at end of file
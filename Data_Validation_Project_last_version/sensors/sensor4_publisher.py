@@ -1,5 +1,5 @@
 import time
-import json
+import orjson
 import random
 from datetime import datetime
 import paho.mqtt.client as mqtt
@@ -65,9 +65,9 @@ def main():
     try:
         while True:
             data = generate_environment_data()
-            payload = json.dumps(data)
+            payload = orjson.dumps(data) # paho accepts the bytes as-is
             client.publish(TOPIC, payload)
-            print(f"[Sensor4] Sent: {payload}")
+            print(f"[Sensor4] Sent: {payload.decode()}")
             time.sleep(2)
     except KeyboardInterrupt:
         print("\n[Sensor4] Environment Publisher stopped.")
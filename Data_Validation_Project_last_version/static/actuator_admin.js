@@ -382,8 +382,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const filename = button.dataset.filename;
         
         if (button.classList.contains('edit-btn')) {
-            // UPDATED: Use the new actuator-specific endpoint
-            apiCall(`/api/actuator-schemas/${filename}`).then(content => {
+            // Read the content from the static schema mount (fast path)
+            apiCall(`/api/schemas-raw/actuators/${filename}`).then(content => {
                 showSchemaEditor(false, filename);
                 // Populate both editors initially
                 populateFormFromJson(content);
@@ -315,7 +315,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const filename = button.dataset.filename;
         
         if (button.classList.contains('edit-btn')) {
-            apiCall(`/api/schemas/${filename}`).then(content => {
+            apiCall(`/api/schemas-raw/${filename}`).then(content => {
                 showSchemaEditor(false, filename);
                 // Populate both editors initially
                 populateFormFromJson(content);
@@ -1,8 +1,77 @@
 # utils.py
 
+import functools
 import json
+import re
 from pandera.errors import SchemaErrors
 
+# Checks whose failure means the value is outside the expected range
+_RANGE_CHECKS = frozenset((
+    "greater_than", "less_than", "greater_than_or_equal_to",
+    "less_than_or_equal_to", "in_range", "between"
+))
+
+# Pandera's dtype check, e.g. "dtype('float64')"
+_DTYPE_CHECK_RE = re.compile(r"dtype\('([^']+)'\)")
+
+# Error priority (lower number is higher priority), as set by _classify_check
+#   missing_field, extra_field   1
+#   wrong_type                   2
+#   null_value                   3
+#   bad_format, mismatched_id    4
+#   out_of_range                 5
+#   check_failed:<check name>    6 (generic catch-all for other checks)
+
+@functools.lru_cache(maxsize=512)
+def _classify_check(check):
+    """
+    Returns (check name, error type, priority) for a failure case's check
+    string. The same few checks fail over and over, so results are cached.
+    """
+    # The check's name, e.g. 'isin' for 'isin(["on", "off"])'
+    check_name = check.split("(", 1)[0]
+
+    if check == "column_in_schema":
+        return check_name, "extra_field", 1
+    if check == "column_in_dataframe":
+        return check_name, "missing_field", 1
+    if check_name == "not_nullable":
+        return check_name, "null_value", 3
+    if check_name == "dtype":
+        return check_name, "wrong_type", 2
+    if check_name in _RANGE_CHECKS:
+        return check_name, "out_of_range", 5
+    if check_name == "equal_to":
+        return check_name, "mismatched_id", 4
+    if check_name == "str_matches":
+        return check_name, "bad_format", 4
+    # Create a specific error type, e.g., 'check_failed:isin'
+    return check_name, f"check_failed:{check_name}", 6
+
+def _describe_error(error_type, column, check, check_name, failed_value):
+    """Returns the (reason, failed_value) pair reported for a classified failure case."""
+    if error_type == "extra_field":
+        return f"An extra field named '{column}' was found, which is not defined in the schema.", "N/A (Extra Field)"
+    if error_type == "missing_field":
+        return f"The required field '{column}' was not found in the data.", "N/A (Missing Field)"
+    if error_type == "null_value":
+        reason = f"The required field '{column}' cannot be null."
+    elif error_type == "wrong_type":
+        match = _DTYPE_CHECK_RE.match(check)
+        expected_type = match.group(1) if match else check
+        actual_type = type(failed_value).__name__ if failed_value is not None else "None"
+        reason = f"The data type of field '{column}' is incorrect. Expected: '{expected_type}', Got: '{actual_type}' with value '{failed_value}'."
+    elif error_type == "out_of_range":
+        reason = f"The value '{failed_value}' in field '{column}' is outside the expected range. Rule: {check}"
+    elif error_type == "mismatched_id":
+        reason = f"The value '{failed_value}' in field '{column}' is different from the expected value. Rule: {check}"
+    elif error_type == "bad_format":
+        reason = f"The value '{failed_value}' in field '{column}' does not match the expected format. Rule: {check}"
+    else:
+        # Generic fallback for any other pandera check (like isin, notin)
+        reason = f"The value '{failed_value}' in field '{column}' failed the '{check_name}' check. Rule: {check}"
+    return reason, failed_value
+
 def parse_pandera_errors(exc: SchemaErrors) -> list:
     """
     Converts errors from a Pandera SchemaErrors exception into a clear, reliable,
@@ -10,84 +79,30 @@ def parse_pandera_errors(exc: SchemaErrors) -> list:
     column, preventing error cascades (e.g., a 'wrong_type' error also causing
     'out_of_range' errors).
     """
-    range_checks = {
-        "greater_than", "less_than", "greater_than_or_equal_to", 
-        "less_than_or_equal_to", "in_range", "between"
-    }
-    
-    # Define error priority (lower number is higher priority)
-    error_priority = {
-        "missing_field": 1,
-        "extra_field": 1,
-        "wrong_type": 2,
-        "null_value": 3,
-        "bad_format": 4,
-        "mismatched_id": 4,
-        "out_of_range": 5,
-        "check_failed": 6, # Generic catch-all for other checks
-        "unknown": 99
-    }
-
-    # This dictionary will hold the single highest-priority error for each column
+    # This dictionary will hold the single highest-priority error for each column,
+    # as a (priority, check, check_name, failed_value, error_type) tuple
     highest_priority_errors = {}
 
-    for _, row in exc.failure_cases.iterrows():
-        column = row.get("column")
-        check = str(row.get("check", ""))
-        failed_value = row.get("failure_case")
-        
-        reason = f"Validation failed for field '{column}' with value '{failed_value}'. Rule: {check}"
-        output_failed_value = failed_value
-        error_type = "unknown"
-
-        # --- Classification Logic (same as before, but now used for prioritization) ---
-        if check == "column_in_schema":
-            column = failed_value
-            reason = f"An extra field named '{column}' was found, which is not defined in the schema."
-            output_failed_value = "N/A (Extra Field)"
-            error_type = "extra_field"
-        elif check == "column_in_dataframe":
-            column = failed_value
-            reason = f"The required field '{column}' was not found in the data."
-            output_failed_value = "N/A (Missing Field)"
-            error_type = "missing_field"
-        elif check.startswith("not_nullable"):
-            reason = f"The required field '{column}' cannot be null."
-            error_type = "null_value"
-        elif check.startswith("dtype"):
-            expected_type = check.split("'")[1] if "'" in check else check
-            actual_type = type(failed_value).__name__ if failed_value is not None else "None"
-            reason = f"The data type of field '{column}' is incorrect. Expected: '{expected_type}', Got: '{actual_type}' with value '{failed_value}'."
-            error_type = "wrong_type"
-        elif any(range_check in check for range_check in range_checks):
-            reason = f"The value '{failed_value}' in field '{column}' is outside the expected range. Rule: {check}"
-            error_type = "out_of_range"
-        elif check.startswith("equal_to"):
-            reason = f"The value '{failed_value}' in field '{column}' is different from the expected value. Rule: {check}"
-            error_type = "mismatched_id"
-        elif check.startswith("str_matches"):
-            reason = f"The value '{failed_value}' in field '{column}' does not match the expected format. Rule: {check}"
-            error_type = "bad_format"
-        else:
-            # New generic fallback for any other pandera check (like isin, notin)
-            # We extract the check name (e.g., 'isin') from the full check string (e.g., 'isin(["on", "off"])')
-            check_name = check.split('(')[0]
-            reason = f"The value '{failed_value}' in field '{column}' failed the '{check_name}' check. Rule: {check}"
-            # Create a specific error type, e.g., 'check_failed:isin'
-            error_type = f"check_failed:{check_name}"
-
+    # Only three columns are read, so walk them as plain tuples rather than
+    # building a Series per row with iterrows()
+    failure_cases = exc.failure_cases[["column", "check", "failure_case"]]
+    for column, check, failed_value in failure_cases.itertuples(index=False, name=None):
+        check = str(check)
+        check_name, error_type, priority = _classify_check(check)
+        if priority == 1:
+            column = failed_value # The extra or missing field's name
 
         # --- Prioritization Logic ---
-        current_error = {
-            "column": column, "check": check, "reason": reason,
-            "failed_value": output_failed_value, "error_type": error_type
-        }
-        
         # If we haven't seen an error for this column yet, or if this new error
-        # has a higher priority, store it.
-        if column not in highest_priority_errors or \
-           error_priority.get(error_type, 99) < error_priority.get(highest_priority_errors[column]["error_type"], 99):
-            highest_priority_errors[column] = current_error
+        # has a higher priority, store it. Reasons are only written for the
+        # errors that are kept, once every row has been seen.
+        stored = highest_priority_errors.get(column)
+        if stored is None or priority < stored[0]:
+            highest_priority_errors[column] = (priority, check, check_name, failed_value, error_type)
 
     # Return only the highest-priority error for each column
-    return list(highest_priority_errors.values())
+    errors = []
+    for column, (_, check, check_name, failed_value, error_type) in highest_priority_errors.items():
+        reason, failed_value = _describe_error(error_type, column, check, check_name, failed_value)
+        errors.append({"column": column, "check": check, "reason": reason, "failed_value": failed_value, "error_type": error_type})
+    return errors
@@ -27,7 +27,13 @@ class Machine(pa.DataFrameModel):
   class Config:
     strict = True
     coerce = True
+
+# Resolved once; the loop below validates every reading against it
+MACHINE_SCHEMA = Machine.to_schema()
     
+# Injected faults: (sensor, out-of-range value)
+_FAULTS = (("vibration", 15.7), ("count", 125))
+
 # Simulating a real sensor data flow
 def generate_sensor_data():
 
@@ -38,15 +44,9 @@ def generate_sensor_data():
 
 
   }
-  faulty_sensor = None
-
   if random.random() < 0.3:
-    faulty_sensor = random.choice([ "vibration", "count"])
-
-  if faulty_sensor == "vibration":
-            reading[faulty_sensor] = 15.7
-  elif faulty_sensor == "count":
-            reading[faulty_sensor] = 125
+    faulty_sensor, bad_value = random.choice(_FAULTS)
+    reading[faulty_sensor] = bad_value
     
           
   return reading
@@ -63,7 +63,7 @@ while True:
     
     try:
         
-        Machine.validate(live_df)  # Data Validation
+        MACHINE_SCHEMA.validate(live_df, inplace=True)  # Data Validation (live_df is not reused, so coerce it in place)
         
         print("Data is valid")
         
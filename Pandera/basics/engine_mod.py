@@ -17,9 +17,12 @@ class engine_data(pa.DataFrameModel):
 
   @pa.dataframe_check # special rule for engine mode
   def check_engine_mode(cls, df : pd.DataFrame):
-    active_mode = (df["mode"] == "active") & (df["temp"].between(70,100))
-    rest_mode = (df["mode"] == "rest") & (df["temp"].between(20, 50))
-    return active_mode | rest_mode
+    # One pass over plain NumPy arrays instead of intermediate Series per comparison
+    mode = df["mode"].to_numpy()
+    temp = df["temp"].to_numpy()
+    active_mode = (mode == "active") & (temp >= 70) & (temp <= 100)
+    rest_mode = (mode == "rest") & (temp >= 20) & (temp <= 50)
+    return pd.Series(active_mode | rest_mode, index=df.index)
 
 # example datas
 valid_data = pd.DataFrame({
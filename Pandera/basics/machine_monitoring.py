@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pandera.pandas as pa
 from pandera.typing.pandas import DataFrame, Series
@@ -15,7 +16,7 @@ class MachineOutput(MachineInput):
 def monitor_machine(df: DataFrame[MachineInput]) -> DataFrame[MachineOutput]:
     # Determine status: alarm if temperature > 80 or oil_level < 2
     conditions = (df["temperature"] > 80) | (df["oil_level"] < 2)
-    status = conditions.map({True: "ALARM", False: "OK"})
+    status = np.where(conditions.to_numpy(), "ALARM", "OK")
     return df.assign(status=status)
 
 # Example data
@@ -2,23 +2,30 @@ import pandas as pd
 import pandera.pandas as pa
 from pandera.typing import Series 
 
+# At most this many failing values are kept per check, so a large CSV with a
+# broken column doesn't produce (and print) one failure case per row.
+N_FAILURE_CASES = 10
+
 class Data_Contract(pa.DataFrameModel):
 
   sensor_id : Series[int] = pa.Field(
       gt = 0,
-      le = 10
+      le = 10,
+      n_failure_cases = N_FAILURE_CASES
   )
 
   gas_concentration_ppm : Series[float] = pa.Field(
       le = 550,
-      ge = 0
+      ge = 0,
+      n_failure_cases = N_FAILURE_CASES
   )
 
   magnetic_flux_uT : Series[float]
 
   sound_level_dB : Series[float] = pa.Field(
       gt = 50.0,
-      ge = 0
+      ge = 0,
+      n_failure_cases = N_FAILURE_CASES
   )
 
 
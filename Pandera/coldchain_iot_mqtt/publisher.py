@@ -11,6 +11,9 @@ MQTT_PORT   = 1883
 MQTT_TOPIC  = "iot/logistics/coldchain/telemetry"
 
 # sensor data simulation
+# Injected faults: (field, wrong value) for temp_range, humidity_type and id_format
+_FAULTS = (("temperature_c", 15.5), ("humidity_percent", 75.5), ("truck_id", "-123"))
+
 def generate_truck_data():
   data = {
       "truck_id": f"TRUCK-{random.randint(100, 999)}",
@@ -32,18 +35,8 @@ def generate_truck_data():
   # simulating wrong data
   if random.random() < 0.3:  
        
-        fault_type = random.choice(['temp_range', 'humidity_type', 'id_format'])
-        
-        if fault_type == 'temp_range':
-            data['temperature_c'] = 15.5  
-            
-
-        elif fault_type == 'humidity_type':
-            data['humidity_percent'] = 75.5  
-            
-
-        elif fault_type == 'id_format':
-            data['truck_id'] = "-123"  
+        field, bad_value = random.choice(_FAULTS)
+        data[field] = bad_value
             
 
   return data
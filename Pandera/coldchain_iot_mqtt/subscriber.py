@@ -1,10 +1,13 @@
 import paho.mqtt.client as mqtt
-import json
+import orjson
 import pandas as pd
 import pandera.pandas as pa
 
 from mqtt_schemas import ColdChainSensorData
 
+# Resolved once instead of going through the model on every message
+SENSOR_SCHEMA = ColdChainSensorData.to_schema()
+
 # mqtt configuration
 MQTT_BROKER = "broker.hivemq.com"
 MQTT_PORT = 1883
@@ -20,16 +23,15 @@ def on_connect(client, userdata, flags, rc):
         print(f"[Subscriber] Connection failed, return code: {rc}")
 
 def on_message(client, userdata, msg):
-    payload = msg.payload.decode('utf-8')
-    print(f"\n[Subscriber] Raw message received: {payload}")
+    print(f"\n[Subscriber] Raw message received: {msg.payload.decode('utf-8', errors='replace')}")
 
     try:
-        data_packet = json.loads(payload)
+        data_packet = orjson.loads(msg.payload) # parses the raw bytes directly
         df = pd.DataFrame([data_packet])
-        ColdChainSensorData.validate(df)  # DATA VALIDATION
+        SENSOR_SCHEMA.validate(df, inplace=True)  # DATA VALIDATION (df is only used here, so coerce it in place)
         print("✅ [Subscriber] Data is valid and accepted.")
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print("❌ [Subscriber] ERROR: Received message is not valid JSON.")
     except pa.errors.SchemaError as e:
         print("❌ [Subscriber] INVALID DATA! Rejected.")
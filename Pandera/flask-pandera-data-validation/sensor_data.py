@@ -4,6 +4,9 @@ import requests
 
 SERVER_URL = 'http://127.0.0.1:5001/data/power' # the url that data will be send
 
+# Injected faults: (field, wrong value) for id_error, range_error and type_error
+_FAULTS = (("id", "SENSOR-12345"), ("current", 25.5), ("voltage", "225.0v"))
+
 # generating random data
 def generate_sensor_reading():
     
@@ -14,14 +17,8 @@ def generate_sensor_reading():
     }
     
     if random.random() < 0.3:
-        fault_type = random.choice(['id_error', 'range_error', 'type_error'])
-      
-        if fault_type == 'id_error':
-            reading['id'] = "SENSOR-12345"
-        elif fault_type == 'range_error':
-            reading['current'] = 25.5
-        elif fault_type == 'type_error':
-            reading['voltage'] = "225.0v"
+        field, bad_value = random.choice(_FAULTS)
+        reading[field] = bad_value
     return reading
 
 def run_sensor_simulator():
@@ -6,6 +6,9 @@ from data_contract import SensorData
 
 app = Flask(__name__)
 
+# Resolved once instead of going through the model on every request
+SENSOR_SCHEMA = SensorData.to_schema()
+
 @app.route("/data/power", methods=["POST"])
 
 # data validation process
@@ -16,7 +19,7 @@ def validate():
   df = pd.DataFrame([data])
 
   try:
-    SensorData.validate(df)
+    SENSOR_SCHEMA.validate(df, inplace=True)
     print("✅ [Server] Data is valid and accepted.")
     return jsonify({"status": "success"}), 200
   except pa.errors.SchemaError as e:
@@ -1,10 +1,16 @@
 from contextlib import asynccontextmanager
+import asyncio
 import json
 import uvicorn
 import glob
 import os
+import tempfile
+import threading
+from copy import deepcopy
+import aiofiles
+import orjson
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -29,14 +35,29 @@ class ConnectionManager:
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        # Send to all clients concurrently so one slow client doesn't delay the rest
+        connections = list(self.active_connections)
+        results = await asyncio.gather(*(c.send_text(message) for c in connections), return_exceptions=True)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 manager = ConnectionManager()
-app = FastAPI(lifespan=lifespan)
+
+async def broadcast_config_update():
+    """
+    Tells the dashboards the config changed, sending the new topic mappings
+    along so they don't have to fetch them again.
+    """
+    config = await asyncio.to_thread(read_config, copy=False)
+    mappings = config.get("topic_mappings", [])
+    await manager.broadcast(orjson.dumps({"type": "config_updated", "topic_mappings": mappings}).decode())
+# Route responses are encoded with orjson instead of the stdlib json encoder
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 CONFIG_FILE = "config.json"
 SCHEMAS_DIR = "schemas"
@@ -61,15 +82,70 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="static")
 
 # --- Config Helper Functions ---
-def read_config():
-    if not os.path.exists(CONFIG_FILE):
-        return {"mqtt_settings": {}, "topic_mappings": []}
-    with open(CONFIG_FILE, "r") as f:
-        return json.load(f)
+# The parsed config.json is kept in memory and only re-read when its mtime changes.
+_CFG_CACHE = {"mtime": None, "data": None, "lock": threading.Lock()}
+
+def read_config(copy=True):
+    """
+    Returns the config dict. Callers that only read it can pass copy=False to
+    get the shared cached object instead of a private deep copy.
+    """
+    with _CFG_CACHE["lock"]:
+        try:
+            mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        except FileNotFoundError:
+            return {"mqtt_settings": {}, "topic_mappings": []}
+        if mtime != _CFG_CACHE["mtime"]:
+            with open(CONFIG_FILE, "rb") as f:
+                _CFG_CACHE["data"] = orjson.loads(f.read())
+            _CFG_CACHE["mtime"] = mtime
+        config = _CFG_CACHE["data"]
+    return deepcopy(config) if copy else config
+
+def _make_temp_file(filepath):
+    """
+    Creates a uniquely named hidden temp file next to `filepath`, so concurrent
+    writers never share one and os.replace stays on the same filesystem.
+    Returns (fd, tmp_path); mkstemp's 0600 mode is widened to a regular file's.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or ".", prefix=".", suffix=".tmp")
+    os.chmod(tmp_path, 0o644)
+    return fd, tmp_path
 
 def write_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    with _CFG_CACHE["lock"]:
+        # Serialized up front and written in one call to a temporary file,
+        # then swapped in, so a crash never leaves a half-written config
+        fd, tmp_path = _make_temp_file(CONFIG_FILE)
+        try:
+            with open(fd, "wb") as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_path, CONFIG_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        # Cache what was just written, so the next read needs no re-parse
+        _CFG_CACHE["data"] = deepcopy(config)
+        _CFG_CACHE["mtime"] = os.stat(CONFIG_FILE).st_mtime_ns
+
+# --- Schema File Helper Functions ---
+# Schema file name -> ((mtime_ns, size), JSON response body), so repeated
+# reads of an unchanged schema are served from memory
+_SCHEMA_BODY_CACHE = {}
+
+async def write_file_atomic(filepath, data):
+    """
+    Writes bytes to a temporary file next to `filepath` and swaps it in with
+    os.replace, so readers never see a partially written schema.
+    """
+    fd, tmp_path = _make_temp_file(filepath)
+    try:
+        async with aiofiles.open(fd, "wb") as f:
+            await f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 # --- Web Page Routes ---
 @app.get("/", response_class=HTMLResponse)
@@ -83,9 +159,9 @@ async def serve_admin(request: Request):
 # --- Main Configuration API Routes ---
 @app.get("/api/mqtt-settings")
 async def get_mqtt_settings():
-    config = read_config()
+    config = read_config(copy=False)
     headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=config.get("mqtt_settings", {}), headers=headers)
+    return ORJSONResponse(content=config.get("mqtt_settings", {}), headers=headers)
 
 @app.post("/api/mqtt-settings")
 async def update_mqtt_settings(request: Request):
@@ -93,37 +169,39 @@ async def update_mqtt_settings(request: Request):
     if not settings.get("broker") or not isinstance(settings.get("port"), int):
         raise HTTPException(status_code=400, detail="Invalid MQTT settings format.")
     
-    config = read_config()
+    config = await asyncio.to_thread(read_config)
     config["mqtt_settings"] = settings
-    write_config(config)
+    await asyncio.to_thread(write_config, config)
     
     restart_mqtt_client()
-    await manager.broadcast("config_updated")
-    return JSONResponse(content={"message": "MQTT settings updated successfully."})
+    await broadcast_config_update()
+    return ORJSONResponse(content={"message": "MQTT settings updated successfully."})
 
 @app.get("/api/topic-mappings")
 async def get_topic_mappings():
-    config = read_config()
+    config = read_config(copy=False)
     headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=config.get("topic_mappings", []), headers=headers)
+    return ORJSONResponse(content=config.get("topic_mappings", []), headers=headers)
 
 @app.post("/api/topic-mappings")
 async def update_topic_mappings(request: Request):
     mappings = await request.json()
-    config = read_config()
+    config = await asyncio.to_thread(read_config)
     config["topic_mappings"] = mappings
-    write_config(config)
+    await asyncio.to_thread(write_config, config)
     restart_mqtt_client()
-    await manager.broadcast("config_updated")
-    return JSONResponse(content={"message": "Topic mappings updated successfully."})
+    await broadcast_config_update()
+    return ORJSONResponse(content={"message": "Topic mappings updated successfully."})
 
 # --- Schema File Management API Routes ---
 @app.get("/api/schemas")
 async def get_all_schema_files():
     """Returns a list of available schema file paths."""
-    schema_files = [os.path.join(SCHEMAS_DIR, f).replace("\\", "/") for f in os.listdir(SCHEMAS_DIR) if f.endswith('.json')]
+    # scandir's entries already know whether they are files, without another stat
+    with os.scandir(SCHEMAS_DIR) as it:
+        schema_files = [os.path.join(SCHEMAS_DIR, e.name).replace("\\", "/") for e in it if e.name.endswith('.json') and e.is_file()]
     headers = {"Cache-Control": "no-store"}
-    return JSONResponse(content=sorted(schema_files), headers=headers)
+    return ORJSONResponse(content=sorted(schema_files), headers=headers)
 
 @app.get("/api/schemas/{filename}")
 async def get_schema_file_content(filename: str):
@@ -132,13 +210,19 @@ async def get_schema_file_content(filename: str):
         raise HTTPException(status_code=400, detail="Invalid filename.")
     
     schema_path = os.path.join(SCHEMAS_DIR, filename)
-    if not os.path.exists(schema_path):
+    try:
+        st = os.stat(schema_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Schema file not found.")
     
     headers = {"Cache-Control": "no-store"}
-    with open(schema_path, "r") as f:
-        content = json.load(f)
-    return JSONResponse(content=content, headers=headers)
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _SCHEMA_BODY_CACHE.get(filename)
+    if cached is None or cached[0] != version:
+        async with aiofiles.open(schema_path, "rb") as f:
+            content = orjson.loads(await f.read())
+        cached = _SCHEMA_BODY_CACHE[filename] = (version, orjson.dumps(content))
+    return Response(content=cached[1], media_type="application/json", headers=headers)
 
 @app.post("/api/schemas")
 async def create_new_schema_file(request: Request):
@@ -154,10 +238,9 @@ async def create_new_schema_file(request: Request):
     if os.path.exists(file_path):
         raise HTTPException(status_code=400, detail="Schema file with this name already exists.")
         
-    with open(file_path, "w") as f:
-        json.dump(content, f, indent=4)
+    await write_file_atomic(file_path, json.dumps(content, indent=4).encode())
         
-    return JSONResponse(content={"message": f"Schema file '{filename}' created successfully."})
+    return ORJSONResponse(content={"message": f"Schema file '{filename}' created successfully."})
 
 @app.put("/api/schemas/{filename}")
 async def update_schema_file_content(filename: str, request: Request):
@@ -167,21 +250,19 @@ async def update_schema_file_content(filename: str, request: Request):
         raise HTTPException(status_code=404, detail="Schema file not found.")
 
     new_content = await request.json()
-    with open(file_path, "w") as f:
-        json.dump(new_content, f, indent=4)
+    await write_file_atomic(file_path, json.dumps(new_content, indent=4).encode())
 
     restart_mqtt_client()
-    await manager.broadcast("config_updated")
-    return JSONResponse(content={"message": f"Schema file '{filename}' updated and client restarted."})
+    await broadcast_config_update()
+    return ORJSONResponse(content={"message": f"Schema file '{filename}' updated and client restarted."})
 
-@app.delete("/api/schemas/{filename}")
-async def delete_schema_file(filename: str):
-    """Deletes a schema file and updates any mappings that use it."""
-    file_path = os.path.join(SCHEMAS_DIR, filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Schema file not found.")
-        
-    os.remove(file_path)
+def _delete_schema_and_unmap(filename):
+    """
+    Deletes a schema file and clears it from the topic mappings that use it.
+    Returns True if the config changed.
+    """
+    os.remove(os.path.join(SCHEMAS_DIR, filename))
+    _SCHEMA_BODY_CACHE.pop(filename, None)
     
     config = read_config()
     schema_path_to_remove = os.path.join(SCHEMAS_DIR, filename).replace("\\", "/")
@@ -193,10 +274,26 @@ async def delete_schema_file(filename: str):
     
     if updated:
         write_config(config)
+    return updated
+
+@app.delete("/api/schemas/{filename}")
+async def delete_schema_file(filename: str):
+    """Deletes a schema file and updates any mappings that use it."""
+    file_path = os.path.join(SCHEMAS_DIR, filename)
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="Schema file not found.")
+        
+    # File and config I/O run in a worker thread to keep the event loop free
+    updated = await asyncio.to_thread(_delete_schema_and_unmap, filename)
+    
+    if updated:
         restart_mqtt_client()
-        await manager.broadcast("config_updated")
+        await broadcast_config_update()
         
-    return JSONResponse(content={"message": f"Schema file '{filename}' deleted and mappings updated."})
+    return ORJSONResponse(content={"message": f"Schema file '{filename}' deleted and mappings updated."})
 
 if __name__ == "__main__":
+    # uvicorn's default "auto" loop and http settings pick uvloop and httptools
+    # when they are installed (see requirements.txt) and fall back to asyncio
+    # and h11 otherwise, e.g. on Windows where uvloop isn't available.
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
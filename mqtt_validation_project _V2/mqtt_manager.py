@@ -1,27 +1,77 @@
+import atexit
+import functools
 import importlib.util
 import json
-import math
+import logging
+import logging.handlers
+import operator
+import os
+import queue
+import re
+import sys
 import threading
 import time
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import paho.mqtt.client as mqtt
-import pandera.pandas as pa
-from pandera.errors import SchemaErrors
-from utils import parse_pandera_errors
+
+# pandas and Pandera (which utils also needs) take a while to import and use a
+# lot of memory, so they are only imported once schemas are actually needed;
+# an API server without a configured broker never loads them.
+pd = pa = SchemaErrors = parse_pandera_errors = None
+_CHECK_FACTORIES = None # Set together with the imports, see below
+
+def _import_validation_libs():
+    """Imports pandas, Pandera and utils into this module's globals, once."""
+    global pd, pa, SchemaErrors, parse_pandera_errors, _CHECK_FACTORIES
+    if _CHECK_FACTORIES is not None:
+        return
+    import pandas as pd
+    import pandera.pandas as pa
+    from pandera.errors import SchemaErrors
+    from utils import parse_pandera_errors
+    # Pandera's built-in check constructors by name (e.g. "in_range"), looked up
+    # once here instead of with hasattr/getattr for every check of every schema
+    _CHECK_FACTORIES = {
+        name: getattr(pa.Check, name) for name in dir(pa.Check)
+        if not name.startswith("_") and callable(getattr(pa.Check, name))
+    }
+
+# --- Per-message logging ---
+# on_message logs through a queue so paho's network thread never blocks on
+# stderr; a background listener does the writing. Set MQTT_LOG_LEVEL=WARNING
+# to keep only errors, or DEBUG to also see which mapping each message used.
+logger = logging.getLogger("mqtt_manager")
+logger.setLevel(os.getenv("MQTT_LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler(sys.stderr)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop) # Drain what's left on exit
+
+# Payloads that need Pandera are validated together, one DataFrame per topic
+# and payload shape, once a batch is this big or this old
+BATCH_MAX_ROWS = 128
+BATCH_FLUSH_INTERVAL = 0.01 # seconds
 
 # Global variable to hold the MQTT client thread
 mqtt_thread = None
 stop_event = threading.Event()
 
-def build_schema_from_json(schema_json: dict) -> pa.DataFrameSchema:
+def build_schema_from_json(schema_json: dict) -> "pa.DataFrameSchema":
     """Dynamically builds a Pandera DataFrameSchema from a JSON definition."""
+    _import_validation_libs()
     columns = {}
     for col_name, col_props in schema_json.get("columns", {}).items():
         checks = []
         if "checks" in col_props:
             for check_name, check_arg in col_props["checks"].items():
-                if hasattr(pa.Check, check_name):
-                    checks.append(getattr(pa.Check, check_name)(check_arg))
+                factory = _CHECK_FACTORIES.get(check_name)
+                if factory is not None:
+                    checks.append(factory(check_arg))
         
         columns[col_name] = pa.Column(
             dtype=col_props.get("dtype", "str"),
@@ -37,11 +87,25 @@ def build_schema_from_json(schema_json: dict) -> pa.DataFrameSchema:
     )
 
 def load_schema_from_file(path: str):
-    """Loads a schema from a JSON file and builds a Pandera schema."""
+    """
+    Loads a schema from a JSON file and builds a Pandera schema.
+    Results are cached per file modification time, and built schemas per file
+    content, so restarting the MQTT client only rebuilds schemas whose files
+    actually changed.
+    """
     try:
-        with open(path, "r") as f:
-            schema_definition = json.load(f)
-        return build_schema_from_json(schema_definition)
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        print(f"Error: Schema file not found at {path}")
+        return None
+    return _load_schema_cached(path, mtime)
+
+@functools.lru_cache(maxsize=128)
+def _load_schema_cached(path: str, mtime: int):
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return _build_schema_cached(raw)
     except FileNotFoundError:
         print(f"Error: Schema file not found at {path}")
         return None
@@ -52,18 +116,146 @@ def load_schema_from_file(path: str):
         print(f"An unexpected error occurred while loading schema from {path}: {e}")
         return None
 
-def replace_nan_with_none(obj):
-    """Recursively walk a dict or list and replace float('nan') with None."""
-    if isinstance(obj, dict):
-        return {k: replace_nan_with_none(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [replace_nan_with_none(elem) for elem in obj]
-    elif isinstance(obj, float) and math.isnan(obj):
+@functools.lru_cache(maxsize=128)
+def _build_schema_cached(raw: bytes):
+    # Keyed by the file's bytes: a rewrite with the same content, or another
+    # file with the same definition, reuses the schema that was already built
+    return build_schema_from_json(json.loads(raw))
+
+_DUMPS_CLEAN_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def dumps_clean(obj) -> bytes:
+    """
+    Serializes a failure report to JSON bytes. orjson writes NaN (including
+    numpy NaN) as null, and anything it can't encode natively falls back to str().
+    """
+    return orjson.dumps(obj, default=str, option=_DUMPS_CLEAN_OPTIONS)
+
+_FAST_DTYPE_TYPES = {"str": (str,), "float64": (float,), "int64": (int,), "bool": (bool,)}
+
+_FAST_COMPARE_CHECKS = {
+    "greater_than": ("min_value", operator.gt),
+    "greater_than_or_equal_to": ("min_value", operator.ge),
+    "less_than": ("max_value", operator.lt),
+    "less_than_or_equal_to": ("max_value", operator.le),
+}
+_INT64_MIN, _INT64_MAX = -2**63, 2**63 - 1
+
+def _fast_check(check, dtype_name):
+    """
+    Turns a Pandera check into a function that takes one value and returns
+    True when it passes, or None if the fast validator doesn't support it.
+    """
+    name, stats = check.name, check.statistics
+
+    if name in _FAST_COMPARE_CHECKS:
+        key, compare = _FAST_COMPARE_CHECKS[name]
+        bound = stats.get(key)
+        if dtype_name not in ("float64", "int64") or type(bound) not in (int, float):
+            return None
+        return lambda v: compare(v, bound)
+    if name in ("equal_to", "not_equal_to"):
+        value = stats.get("value")
+        if type(value) not in (str, int, float, bool):
+            return None
+        return (lambda v: v == value) if name == "equal_to" else (lambda v: v != value)
+    if name in ("isin", "notin"):
+        try:
+            values = frozenset(stats.get("allowed_values" if name == "isin" else "forbidden_values"))
+        except TypeError:
+            return None
+        return (lambda v: v in values) if name == "isin" else (lambda v: v not in values)
+
+    if dtype_name != "str":
+        return None
+    if name in ("str_matches", "str_contains"):
+        try:
+            pattern = re.compile(stats.get("pattern"))
+        except (TypeError, re.error):
+            return None
+        # pandas' str.match anchors at the start, str.contains searches anywhere
+        find = pattern.match if name == "str_matches" else pattern.search
+        return lambda v: find(v) is not None
+    if name == "str_startswith":
+        prefix = stats.get("string")
+        return (lambda v: v.startswith(prefix)) if type(prefix) is str else None
+    if name == "str_endswith":
+        suffix = stats.get("string")
+        return (lambda v: v.endswith(suffix)) if type(suffix) is str else None
+    return None
+
+def compile_fast_validator(schema: "pa.DataFrameSchema"):
+    """
+    Compiles a schema into a function that checks a parsed JSON payload
+    directly, without building a DataFrame. It returns True only when Pandera
+    would accept the payload; False means "let Pandera decide" (and build the
+    error report). Returns None if the schema uses features it doesn't cover.
+    """
+    if schema.strict not in (True, False) or schema.ordered or schema.index is not None or schema.checks:
         return None
-    return obj
+
+    columns = []
+    for col_name, column in schema.columns.items():
+        dtype_name = str(column.dtype)
+        if dtype_name not in _FAST_DTYPE_TYPES or column.regex or not column.required:
+            return None
+        types = _FAST_DTYPE_TYPES[dtype_name]
+        if dtype_name == "float64" and (column.coerce or schema.coerce):
+            types = (float, int) # ints are coerced to floats losslessly
+        checks = []
+        if dtype_name == "int64":
+            checks.append(lambda v: _INT64_MIN <= v <= _INT64_MAX)
+        for check in column.checks:
+            passes = _fast_check(check, dtype_name)
+            if passes is None:
+                return None
+            checks.append(passes)
+        columns.append((col_name, types, tuple(checks)))
+    columns = tuple(columns)
+    n_columns = len(columns)
+    strict = schema.strict is True
+
+    def validate(data):
+        if type(data) is not dict or (strict and len(data) != n_columns):
+            return False
+        for col_name, types, checks in columns:
+            v = data.get(col_name)
+            # Missing values, nulls and NaNs are left to Pandera, which knows about nullable columns
+            if v is None or v != v or type(v) not in types:
+                return False
+            for passes in checks:
+                if not passes(v):
+                    return False
+        return True
+
+    return validate
+
+def schema_is_batchable(schema: "pa.DataFrameSchema") -> bool:
+    """
+    True if validating several payloads as one DataFrame gives each row the
+    same result as validating it on its own, i.e. no check looks across rows.
+    """
+    if schema.checks or schema.unique or schema.index is not None or schema.drop_invalid_rows:
+        return False
+    for column in schema.columns.values():
+        if column.unique or any(check.name == "unique_values_eq" for check in column.checks):
+            return False
+    return True
+
+def rows_to_frame(rows):
+    """
+    Builds the DataFrame Pandera validates from parsed payloads. Same-shape
+    dicts are laid out column by column, which skips the per-record key
+    matching of pd.DataFrame(rows) but infers exactly the same dtypes.
+    """
+    first = rows[0]
+    if type(first) is dict and first:
+        return pd.DataFrame({key: [row[key] for row in rows] for key in first})
+    return pd.DataFrame(rows)
 
 class MQTTClient:
     def __init__(self, broker, port, topic_mappings):
+        _import_validation_libs()
         self.broker = broker
         self.port = port
         self.topic_mappings = {mapping['source']: mapping for mapping in topic_mappings}
@@ -71,6 +263,23 @@ class MQTTClient:
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
         self.schemas = {}
+        self.fast_validators = {} # schema path -> compile_fast_validator() result
+        self.batchable = set() # schema paths without a fast validator whose payloads may be validated in batches
+        # source topic -> (mapping, schema path, schema, fast validator, batchable),
+        # resolved once in start() so a message costs a single dict lookup
+        self.routes = {}
+        # (topic, keys, value types) -> [mapping, schema, [(payload, data), ...]] awaiting Pandera
+        self._batches = {}
+        self._batch_lock = threading.Lock()
+        # Validates messages off the network thread; pandas and NumPy release
+        # the GIL for much of their work, so several can run at once. Each
+        # topic always goes to the same single-thread executor, so its
+        # messages are re-published in the order they arrived (for batched
+        # topics, only within each payload shape).
+        self._pools = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"mqtt-worker-{i}")
+            for i in range(os.cpu_count() or 1)
+        ]
 
     def on_connect(self, client, userdata, flags, rc, props):
         if rc == 0:
@@ -83,53 +292,140 @@ class MQTTClient:
             print(f"[MQTT] Failed to connect, return code {rc}")
 
     def on_message(self, client, userdata, msg):
-        source_topic = msg.topic
-        
+        # Validation runs on the topic's worker, so paho's network thread only
+        # hands the message over
+        pool = self._pools[hash(msg.topic) % len(self._pools)]
+        try:
+            pool.submit(self._handle_message, client, msg.topic, msg.payload)
+        except RuntimeError: # The worker was shut down while the client is stopping
+            logger.debug("[MQTT-DEBUG] Client stopping, dropped a message from '%s'.", msg.topic)
+
+    def _handle_message(self, client, source_topic, payload):
+        """Validates one message and re-publishes it. `payload` is the raw message bytes."""
         # Find the corresponding mapping for the source topic
-        mapping = self.topic_mappings.get(source_topic)
-        if not mapping:
-            print(f"[MQTT-DEBUG] No mapping found for topic '{source_topic}'. Ignoring message.")
+        route = self.routes.get(source_topic)
+        if not route:
+            logger.debug("[MQTT-DEBUG] No mapping found for topic '%s'. Ignoring message.", source_topic)
             return
+        mapping, schema_path, schema, fast_validate, batchable = route
 
         # Debug log to show which mapping is being used
-        print(f"[MQTT-DEBUG] Using mapping for '{source_topic}': Target-V: '{mapping['validated']}', Target-F: '{mapping['failed']}'")
+        logger.debug("[MQTT-DEBUG] Using mapping for '%s': Target-V: '%s', Target-F: '%s'", source_topic, mapping['validated'], mapping['failed'])
 
         try:
-            payload = msg.payload.decode()
-            data = json.loads(payload)
-            df = pd.DataFrame([data])
+            # orjson parses the raw bytes, and paho re-publishes them as-is
+            data = orjson.loads(payload)
             
-            schema_path = mapping.get("schema")
             if not schema_path:
                 # If no schema is defined for the mapping, consider it valid
                 client.publish(mapping["validated"], payload, retain=False)
-                print(f"[NO-SCHEMA-VALID] {source_topic} -> {mapping['validated']}")
+                logger.info("[NO-SCHEMA-VALID] %s -> %s", source_topic, mapping['validated'])
                 return
 
-            schema = self.schemas.get(schema_path) # Get schema by path, not topic
             if not schema:
-                print(f"[MQTT] Schema '{schema_path}' not loaded for topic {source_topic}. Skipping validation.")
+                logger.warning("[MQTT] Schema '%s' not loaded for topic %s. Skipping validation.", schema_path, source_topic)
                 # Optionally, treat as valid if schema file is missing or failed to load
                 client.publish(mapping["validated"], payload, retain=False)
                 return
 
-            schema.validate(df, lazy=True)
+            if batchable and type(data) is dict:
+                # No fast validator: validate it together with its neighbours
+                self._add_to_batch(source_topic, mapping, schema, payload, data)
+                return
+            if fast_validate is None or not fast_validate(data):
+                # Pandera on a one-row DataFrame has the final say (and reports every error)
+                schema.validate(rows_to_frame((data,)), lazy=True)
             client.publish(mapping["validated"], payload, retain=False)
-            print(f"[VALID] {source_topic} -> {mapping['validated']}")
+            logger.info("[VALID] %s -> %s", source_topic, mapping['validated'])
 
-        except json.JSONDecodeError:
-            print(f"[ERROR] Could not decode JSON from {source_topic}")
+        except orjson.JSONDecodeError:
+            logger.error("[ERROR] Could not decode JSON from %s", source_topic)
         except SchemaErrors as e:
-            errors = parse_pandera_errors(e)
-            fail_msg = {"sensor": source_topic.strip("/"), "errors": errors, "original_payload": json.loads(payload)}
-            
-            # Clean the message of any NaN values before publishing
-            cleaned_fail_msg = replace_nan_with_none(fail_msg)
+            self._publish_failed(client, source_topic, mapping, data, e)
+        except Exception as e:
+            logger.error("[ERROR] An unexpected error occurred in _handle_message: %s", e)
+
+    def _resolve_routes(self):
+        """Resolves each mapping's schema objects, after the schemas are loaded."""
+        self.routes = {}
+        for source_topic, mapping in self.topic_mappings.items():
+            schema_path = mapping.get("schema")
+            self.routes[source_topic] = (
+                mapping,
+                schema_path,
+                self.schemas.get(schema_path), # Get schema by path, not topic
+                self.fast_validators.get(schema_path),
+                schema_path in self.batchable,
+            )
+
+    def _publish_failed(self, client, source_topic, mapping, data, e):
+        """Publishes the failure report for a payload Pandera rejected with `e`."""
+        errors = parse_pandera_errors(e)
+        fail_msg = {"sensor": source_topic.strip("/"), "errors": errors, "original_payload": data}
+        
+        # NaN values are written as null
+        client.publish(mapping["failed"], dumps_clean(fail_msg), retain=False)
+        logger.info("[INVALID] %s -> %s", source_topic, mapping['failed'])
+
+    def _add_to_batch(self, source_topic, mapping, schema, payload, data):
+        """
+        Queues a payload for batched Pandera validation. Batches are keyed by
+        topic and payload shape (keys and value types), so pandas infers the
+        same column dtypes for the batch as for each row alone.
+        """
+        key = (source_topic, tuple(data), tuple(map(type, data.values())))
+        with self._batch_lock:
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = self._batches[key] = [mapping, schema, []]
+            batch[2].append((payload, data))
+            if len(batch[2]) < BATCH_MAX_ROWS:
+                return
+            del self._batches[key]
+        self._validate_batch(key[0], *batch)
+
+    def _flush_batches(self):
+        with self._batch_lock:
+            if not self._batches:
+                return
+            batches, self._batches = self._batches, {}
+        for key, batch in batches.items():
+            self._validate_batch(key[0], *batch)
+
+    def _batch_flusher(self, stop):
+        while not stop.wait(BATCH_FLUSH_INTERVAL):
+            self._flush_batches()
+        self._flush_batches() # Whatever the last messages left behind
 
-            client.publish(mapping["failed"], json.dumps(cleaned_fail_msg), retain=False)
-            print(f"[INVALID] {source_topic} -> {mapping['failed']}")
+    def _validate_batch(self, source_topic, mapping, schema, rows):
+        """
+        Validates one batch of same-shape payloads as a single DataFrame and
+        routes every row to the validated or failed topic. Rows that fail are
+        validated again on their own, so their error reports are exactly what
+        single-message validation produces.
+        """
+        client = self.client
+        try:
+            try:
+                schema.validate(rows_to_frame([data for _, data in rows]), lazy=True)
+                failed_rows = ()
+            except SchemaErrors as e:
+                row_index = e.failure_cases["index"]
+                # Failures without a row (a missing or extra column, a wrong
+                # column dtype) hit every row, since they all share a shape
+                failed_rows = range(len(rows)) if row_index.isna().any() else set(row_index)
+
+            for i, (payload, data) in enumerate(rows):
+                if i in failed_rows:
+                    try:
+                        schema.validate(rows_to_frame((data,)), lazy=True)
+                    except SchemaErrors as e:
+                        self._publish_failed(client, source_topic, mapping, data, e)
+                        continue
+                client.publish(mapping["validated"], payload, retain=False)
+                logger.info("[VALID] %s -> %s", source_topic, mapping['validated'])
         except Exception as e:
-            print(f"[ERROR] An unexpected error occurred in on_message: {e}")
+            logger.error("[ERROR] An unexpected error occurred while validating a batch from %s: %s", source_topic, e)
 
     def start(self):
         global stop_event
@@ -138,20 +434,46 @@ class MQTTClient:
         print(f"[MQTT] Loading schemas...")
         # Load all unique schema files defined in mappings
         unique_schema_paths = {m['schema'] for m in self.topic_mappings.values() if 'schema' in m}
-        for path in unique_schema_paths:
-            schema = load_schema_from_file(path)
+        paths = sorted(unique_schema_paths)
+        # Files are read and parsed in parallel; results are stored here, in path order
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            loaded = list(pool.map(load_schema_from_file, paths))
+        for path, schema in zip(paths, loaded):
             if schema:
                 self.schemas[path] = schema # Store schema by its path
-                print(f"  - Loaded schema from {path}")
+                fast_validate = compile_fast_validator(schema)
+                if fast_validate:
+                    self.fast_validators[path] = fast_validate
+                elif schema_is_batchable(schema):
+                    # Messages the fast validator rejects are nearly always
+                    # invalid, and those are validated alone anyway (for their
+                    # own error report), so only schemas without one batch
+                    self.batchable.add(path)
+                print(f"  - Loaded schema from {path}{' (fast path)' if fast_validate else ''}")
+        self._resolve_routes()
         
         print(f"[MQTT] Connecting to {self.broker}:{self.port}...")
         self.client.connect(self.broker, self.port, 60)
         
-        while not stop_event.is_set():
-            self.client.loop(timeout=1.0)
+        batch_stop = threading.Event()
+        flusher = threading.Thread(target=self._batch_flusher, args=(batch_stop,), name="mqtt-batches", daemon=True)
+        flusher.start()
+
+        # paho runs the network loop in its own thread; this one just waits
+        # (without polling) until it is asked to stop.
+        self.client.loop_start()
+        stop_event.wait()
         
-        print("[MQTT] Loop stopped.")
+        # Take no more messages, let the queued ones finish, then validate
+        # what's left in the batches, all while still connected
+        self.client.on_message = None
+        for pool in self._pools:
+            pool.shutdown(wait=True)
+        batch_stop.set()
+        flusher.join()
         self.client.disconnect()
+        self.client.loop_stop()
+        print("[MQTT] Loop stopped.")
         print("[MQTT] Disconnected.")
 
 def start_mqtt_client():
@@ -338,12 +338,16 @@ document.addEventListener('DOMContentLoaded', () => {
 
     /**
      * Fetches topics from the backend and initializes the MQTT client.
+     * Mappings pushed over the WebSocket are passed in directly, skipping the fetch.
      */
-    async function initializeApp() {
+    async function initializeApp(pushedMappings = null) {
         try {
-            const response = await fetch('/api/topic-mappings');
-            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-            const mappings = await response.json();
+            let mappings = pushedMappings;
+            if (!mappings) {
+                const response = await fetch('/api/topic-mappings');
+                if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                mappings = await response.json();
+            }
             
             // Store the set of validated topics globally
             validatedTopics = new Set(mappings.map(m => m.validated));
@@ -400,10 +404,17 @@ document.addEventListener('DOMContentLoaded', () => {
         };
 
         ws.onmessage = (event) => {
-            if (event.data === 'config_updated') {
+            // The server sends the new topic mappings along with the update
+            let update;
+            try {
+                update = JSON.parse(event.data);
+            } catch (e) {
+                update = { type: event.data };
+            }
+            if (update.type === 'config_updated') {
                 console.log('Configuration has changed on the server. Re-initializing...');
                 // initializeApp zaten bağlantıyı güvenli bir şekilde yönetiyor.
-                initializeApp();
+                initializeApp(update.topic_mappings || null);
             }
         };
 
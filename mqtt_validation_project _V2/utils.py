@@ -3,6 +3,54 @@
 import json
 from pandera.errors import SchemaErrors
 
+# Each handler takes (column, check, failed_value) and returns the
+# (column, reason, failed_value, error_type) reported for the failure case.
+def _extra_field(column, check, failed_value):
+    # Extra field error: The column name is in 'failure_case'.
+    column = failed_value
+    reason = f"An extra field named '{column}' was found, which is not defined in the schema."
+    return column, reason, "N/A (Extra Field)", "extra_field"
+
+def _missing_field(column, check, failed_value):
+    # Missing field error: The column name is in 'failure_case'.
+    column = failed_value
+    reason = f"The required field '{column}' was not found in the data (missing)."
+    return column, reason, "N/A (Missing Field)", "missing_field"
+
+def _null_value(column, check, failed_value):
+    return column, f"The required field '{column}' cannot be null.", failed_value, "null_value"
+
+def _wrong_type(column, check, failed_value):
+    expected_type = check.split("'")[1] if "'" in check else check
+    actual_type = type(failed_value).__name__ if failed_value is not None else "None"
+    reason = f"The data type of field '{column}' is incorrect. Expected: '{expected_type}', Got: '{actual_type}'."
+    return column, reason, failed_value, "wrong_type"
+
+def _out_of_range(column, check, failed_value):
+    reason = f"The value '{failed_value}' in field '{column}' is outside the expected range. Rule: {check}"
+    return column, reason, failed_value, "out_of_range"
+
+def _mismatched_id(column, check, failed_value):
+    reason = f"The value '{failed_value}' in field '{column}' is different from the expected value. Rule: {check}"
+    return column, reason, failed_value, "mismatched_id"
+
+def _bad_format(column, check, failed_value):
+    reason = f"The value '{failed_value}' in field '{column}' does not match the expected format. Rule: {check}"
+    return column, reason, failed_value, "bad_format"
+
+# Handler per check name, i.e. the check string up to its arguments
+# ('dtype' for "dtype('float64')")
+_DISPATCH = {
+    "column_in_schema": _extra_field,
+    "column_in_dataframe": _missing_field,
+    "not_nullable": _null_value,
+    "dtype": _wrong_type,
+    "between": _out_of_range,
+    "greater_than_or_equal_to": _out_of_range,
+    "equal_to": _mismatched_id,
+    "str_matches": _bad_format,
+}
+
 def parse_pandera_errors(exc: SchemaErrors) -> list:
     """
     Converts errors from a Pandera SchemaErrors exception into a clear and reliable format
@@ -12,52 +60,20 @@ def parse_pandera_errors(exc: SchemaErrors) -> list:
     parsed_errors = []
     
     # exc.failure_cases is a DataFrame containing structured information about the errors.
-    for _, row in exc.failure_cases.iterrows():
-        column = row.get("column")
-        check = row.get("check")
-        failed_value = row.get("failure_case")
+    # Only three columns are read, so walk them as plain tuples rather than
+    # building a Series per row with iterrows()
+    failure_cases = exc.failure_cases[["column", "check", "failure_case"]]
+    for column, check, failed_value in failure_cases.itertuples(index=False, name=None):
         
-        # Default values for error messages
-        reason = f"The value '{failed_value}' in field '{column}' violated the rule: {check}"
-        output_failed_value = failed_value
-        error_type = "unknown" # Default error type
-
         # Create a specific and clear description for each error type
-        if check == "column_in_schema":
-            # Extra field error: The column name is in 'failure_case'.
-            column = failed_value
-            reason = f"An extra field named '{column}' was found, which is not defined in the schema."
-            output_failed_value = "N/A (Extra Field)"
-            error_type = "extra_field"
-        
-        elif check == "column_in_dataframe":
-            # Missing field error: The column name is in 'failure_case'.
-            column = failed_value
-            reason = f"The required field '{column}' was not found in the data (missing)."
-            output_failed_value = "N/A (Missing Field)"
-            error_type = "missing_field"
-
-        elif check and check.startswith("not_nullable"):
-            reason = f"The required field '{column}' cannot be null."
-            error_type = "null_value"
-        
-        elif check and check.startswith("dtype"):
-            expected_type = check.split("'")[1] if "'" in check else check
-            actual_type = type(failed_value).__name__ if failed_value is not None else "None"
-            reason = f"The data type of field '{column}' is incorrect. Expected: '{expected_type}', Got: '{actual_type}'."
-            error_type = "wrong_type"
-        
-        elif check and (check.startswith("between") or check.startswith("greater_than_or_equal_to")):
-            reason = f"The value '{failed_value}' in field '{column}' is outside the expected range. Rule: {check}"
-            error_type = "out_of_range"
-        
-        elif check and check.startswith("equal_to"):
-            reason = f"The value '{failed_value}' in field '{column}' is different from the expected value. Rule: {check}"
-            error_type = "mismatched_id"
-        
-        elif check and check.startswith("str_matches"):
-            reason = f"The value '{failed_value}' in field '{column}' does not match the expected format. Rule: {check}"
-            error_type = "bad_format"
+        handler = _DISPATCH.get(check.split("(", 1)[0]) if isinstance(check, str) else None
+        if handler is not None:
+            column, reason, output_failed_value, error_type = handler(column, check, failed_value)
+        else:
+            # Default values for error messages
+            reason = f"The value '{failed_value}' in field '{column}' violated the rule: {check}"
+            output_failed_value = failed_value
+            error_type = "unknown" # Default error type
 
         parsed_errors.append({
             "column": column,
@@ -1,7 +1,7 @@
 @echo off
 cd /d "%~dp0"
 
-REM Sensor 1
+REM Sensor 1 (or replace the three sensors with: python sensors\all_sensors_publisher.py)
 start cmd /k "python sensors\sensor1_publisher.py"
 
 REM Sensor 2
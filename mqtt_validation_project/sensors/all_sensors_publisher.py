@@ -0,0 +1,40 @@
+# sensors/all_sensors_publisher.py
+# Publishes all three sensors' data from one process over a single MQTT connection
+
+import time
+import orjson
+import paho.mqtt.client as mqtt
+
+from sensor1_publisher import generate_sensor1_data, TOPIC as SENSOR1_TOPIC
+from sensor2_publisher import generate_sensor2_data, TOPIC as SENSOR2_TOPIC
+from sensor3_publisher import generate_sensor3_data, TOPIC as SENSOR3_TOPIC
+
+BROKER = "broker.hivemq.com"
+PORT   = 1883
+PUBLISH_INTERVAL = 2 # seconds, for each sensor
+
+SENSORS = [
+    ("Sensor1", SENSOR1_TOPIC, generate_sensor1_data),
+    ("Sensor2", SENSOR2_TOPIC, generate_sensor2_data),
+    ("Sensor3", SENSOR3_TOPIC, generate_sensor3_data),
+]
+
+def main():
+    client = mqtt.Client(); client.connect(BROKER, PORT)
+    # Network traffic and keepalive pings are handled on paho's own thread
+    client.loop_start()
+    print(f"[Sensors] Connected: {BROKER}:{PORT}, topics={[topic for _, topic, _ in SENSORS]}")
+    try:
+        next_publish = time.monotonic()
+        while True:
+            for name, topic, generate in SENSORS:
+                payload = orjson.dumps(generate())
+                client.publish(topic, payload)
+                print(f"[{name}] Sent: {payload.decode()}")
+            next_publish += PUBLISH_INTERVAL
+            time.sleep(max(0.0, next_publish - time.monotonic()))
+    except KeyboardInterrupt:
+        print("\n[Sensors] publish stopped"); client.disconnect(); client.loop_stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # sensors/sensor1_publisher.py
 
 import time
-import json
+import orjson
 import random
 from datetime import datetime
 import paho.mqtt.client as mqtt
@@ -87,9 +87,9 @@ def main():
     try:
         while True:
             data = generate_sensor1_data()
-            payload = json.dumps(data)
+            payload = orjson.dumps(data)
             client.publish(TOPIC, payload)
-            print(f"[Sensor1] Sent: {payload}")
+            print(f"[Sensor1] Sent: {payload.decode()}")
             time.sleep(2)  # Her 2 saniyede bir
     except KeyboardInterrupt:
         print("\n[Sensor1] publish stopped.")
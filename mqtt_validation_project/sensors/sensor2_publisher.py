@@ -1,6 +1,7 @@
 # sensors/sensor2_publisher.py
 
-import time, json, random
+import time, random
+import orjson
 from datetime import datetime
 import paho.mqtt.client as mqtt
 
@@ -74,7 +75,7 @@ def main():
     try:
         while True:
             data = generate_sensor2_data()
-            client.publish(TOPIC, json.dumps(data))
+            client.publish(TOPIC, orjson.dumps(data))
             print(f"[Sensor2] {data}")
             time.sleep(2)
     except KeyboardInterrupt:
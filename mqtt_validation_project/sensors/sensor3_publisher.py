@@ -1,6 +1,7 @@
 # sensors/sensor3_publisher.py
 
-import time, json, random
+import time, random
+import orjson
 from datetime import datetime
 import paho.mqtt.client as mqtt
 
@@ -8,6 +9,46 @@ BROKER = "broker.hivemq.com"
 PORT   = 1883
 TOPIC  = "/sensor3"
 
+# --- Error injectors: each one breaks a valid record in place ---
+def _inject_out_of_bounds(data):
+    choice = random.choice(["voltage", "current", "power"])
+    if choice == "voltage":
+        data["voltage"] = round(random.choice([random.uniform(231, 300), random.uniform(50, 109)]), 2)
+    elif choice == "current":
+        data["current"] = round(random.choice([random.uniform(21, 30), random.uniform(-10, -1)]), 2)
+    else: # power
+        data["power"] = -100  # Negatif güç
+
+def _inject_missing_key(data):
+    del data[random.choice(["voltage", "current", "power"])]
+
+def _inject_wrong_type(data):
+    choice = random.choice(["voltage", "current", "power"])
+    data[choice] = f"invalid-{choice}"
+
+def _inject_null_value(data):
+    data[random.choice(["voltage", "current", "power"])] = None
+
+def _inject_extra_field(data):
+    data["frequency"] = "50Hz"
+
+def _inject_malformed_timestamp(data):
+    data["timestamp"] = "2023/01/01 12:00:00"
+
+def _inject_wrong_id(data):
+    data["sensor_id"] = "invalid-sensor-3"
+
+ERROR_INJECTORS = {
+    "out_of_bounds": _inject_out_of_bounds,
+    "missing_key": _inject_missing_key,
+    "wrong_type": _inject_wrong_type,
+    "null_value": _inject_null_value,
+    "extra_field": _inject_extra_field,
+    "malformed_timestamp": _inject_malformed_timestamp,
+    "wrong_id": _inject_wrong_id,
+}
+ERROR_TYPES = list(ERROR_INJECTORS)
+
 def generate_sensor3_data():
     """
     %90 valid, %10 invalid
@@ -31,53 +72,29 @@ def generate_sensor3_data():
 
 
     if random.random() < 0.1:
-        error_type = random.choice([
-            "out_of_bounds",
-            "missing_key",
-            "wrong_type",
-            "null_value",
-            "extra_field",
-            "malformed_timestamp",
-            "wrong_id"
-        ])
-
-
-        if error_type == "out_of_bounds":
-            choice = random.choice(["voltage", "current", "power"])
-            if choice == "voltage":
-                data["voltage"] = round(random.choice([random.uniform(231, 300), random.uniform(50, 109)]), 2)
-            elif choice == "current":
-                data["current"] = round(random.choice([random.uniform(21, 30), random.uniform(-10, -1)]), 2)
-            else: # power
-                data["power"] = -100  # Negatif güç
-        elif error_type == "missing_key":
-            del data[random.choice(["voltage", "current", "power"])]
-        elif error_type == "wrong_type":
-            choice = random.choice(["voltage", "current", "power"])
-            data[choice] = f"invalid-{choice}"
-        elif error_type == "null_value":
-            choice = random.choice(["voltage", "current", "power"])
-            data[choice] = None
-        elif error_type == "extra_field":
-            data["frequency"] = "50Hz"
-        elif error_type == "malformed_timestamp":
-            data["timestamp"] = "2023/01/01 12:00:00"  
-        elif error_type == "wrong_id":
-            data["sensor_id"] = "invalid-sensor-3"
+        ERROR_INJECTORS[random.choice(ERROR_TYPES)](data)
 
     return data
 
+PUBLISH_INTERVAL = 2 # seconds
+
 def main():
     client = mqtt.Client(); client.connect(BROKER, PORT)
+    # Network traffic and keepalive pings are handled on paho's own thread
+    client.loop_start()
     print(f"[Sensor3] Connected, topic={TOPIC}")
     try:
+        next_publish = time.monotonic()
         while True:
             data = generate_sensor3_data()
-            client.publish(TOPIC, json.dumps(data))
+            client.publish(TOPIC, orjson.dumps(data))
             print(f"[Sensor3] {data}")
-            time.sleep(2)
+            # Sleep until the next slot rather than a fixed 2 s so the time
+            # spent publishing doesn't make the cadence drift
+            next_publish += PUBLISH_INTERVAL
+            time.sleep(max(0.0, next_publish - time.monotonic()))
     except KeyboardInterrupt:
-        print("\n[Sensor3] publish stopped"); client.disconnect()
+        print("\n[Sensor3] publish stopped"); client.disconnect(); client.loop_stop()
 
 if __name__ == "__main__":
     main()
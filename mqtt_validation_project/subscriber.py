@@ -1,6 +1,8 @@
 # subscriber.py
 
-import json
+import threading
+import time
+import orjson
 import pandas as pd
 import paho.mqtt.client as mqtt
 from pandera.errors import SchemaErrors
@@ -20,7 +22,7 @@ from schemas.sensor2_schema import Sensor2Schema
 from schemas.sensor3_schema import Sensor3Schema
 
 
-from utils import parse_pandera_errors
+from utils import compile_fast_validator, parse_pandera_errors
 
 # MQTT broker
 BROKER = "broker.hivemq.com"
@@ -29,36 +31,63 @@ PORT   = 1883
 # topics
 SENSOR_TOPICS = ["/sensor1", "/sensor2", "/sensor3"]
 
-def replace_nan_with_null(obj):
+# Bound validate method per topic; any other topic is checked against sensor3's schema
+SCHEMA_VALIDATORS = {
+    "/sensor1": Sensor1Schema.validate,
+    "/sensor2": Sensor2Schema.validate,
+    "/sensor3": Sensor3Schema.validate,
+}
+
+# Checks a message dict against the topic's schema without pandas; messages it
+# accepts skip Pandera entirely
+FAST_VALIDATORS = {
+    "/sensor1": compile_fast_validator(Sensor1Schema),
+    "/sensor2": compile_fast_validator(Sensor2Schema),
+    "/sensor3": compile_fast_validator(Sensor3Schema),
+}
+
+# Messages of topics without a fast validator are validated in batches, one
+# DataFrame per topic and payload shape, once a batch is this big or this old
+BATCH_MAX_ROWS = 100
+BATCH_FLUSH_INTERVAL = 0.05 # seconds
+
+# (topic, keys, value types) -> [(payload, data), ...] awaiting validation
+_batches = {}
+_batch_lock = threading.Lock()
+
+_DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def dumps_clean(obj) -> bytes:
     """
-    Recursively walk a dictionary or list and replace NaN values with None (which becomes null in JSON).
+    Serializes a failure report to strict JSON bytes in one pass. orjson
+    writes NaN (including numpy NaN) as null, and anything it can't encode
+    natively falls back to str().
     """
-    if isinstance(obj, dict):
-        return {k: replace_nan_with_null(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [replace_nan_with_null(elem) for elem in obj]
-    elif isinstance(obj, float) and pd.isna(obj):
-        return None
-    return obj
-
-def process_message(topic: str, payload: str, client: mqtt.Client):
-
-    data = json.loads(payload)
-    df = pd.DataFrame([data])
-
-    if topic == "/sensor1":
-        schema = Sensor1Schema
-    elif topic == "/sensor2":
-        schema = Sensor2Schema
-    else:
-        schema = Sensor3Schema
+    return orjson.dumps(obj, default=str, option=_DUMPS_OPTIONS)
 
+def rows_to_frame(rows):
+    """
+    Builds the DataFrame to validate from parsed payloads. Same-shape dicts
+    are laid out column by column, which infers the same dtypes as
+    pd.DataFrame(rows) without its per-record key matching.
+    """
+    first = rows[0]
+    if type(first) is dict and first:
+        return pd.DataFrame({key: [row[key] for row in rows] for key in first})
+    return pd.DataFrame(rows)
+
+def publish_valid(topic: str, payload: bytes, data, client: mqtt.Client):
+    # Forward the received bytes as-is instead of re-encoding the parsed data
+    client.publish(f"{topic}/validated", payload)
+    print(f"[VALID] {topic} → {data}")
+
+def validate_one(topic: str, payload: bytes, data, client: mqtt.Client):
+    """Validates a single message on its own and publishes the result."""
     try:
         
-        schema.validate(df, lazy=True)
+        SCHEMA_VALIDATORS.get(topic, Sensor3Schema.validate)(rows_to_frame([data]), lazy=True)
        
-        client.publish(f"{topic}/validated", json.dumps(data))
-        print(f"[VALID] {topic} → {data}")
+        publish_valid(topic, payload, data, client)
     except SchemaErrors as e:
         
         errors = parse_pandera_errors(e)
@@ -68,11 +97,84 @@ def process_message(topic: str, payload: str, client: mqtt.Client):
             "original_payload": data
         }
         
-        # Replace NaN with null before publishing
-        fail_msg_cleaned = replace_nan_with_null(fail_msg)
+        # NaN becomes null in the published report
+        fail_json = dumps_clean(fail_msg)
         
-        client.publish(f"{topic}/failed", json.dumps(fail_msg_cleaned))
-        print(f"[INVALID] {topic} → {fail_msg_cleaned}")
+        client.publish(f"{topic}/failed", fail_json)
+        print(f"[INVALID] {topic} → {fail_json.decode()}")
+
+def validate_batch(topic: str, rows: list, client: mqtt.Client):
+    """
+    Validates a batch of same-shape messages as one DataFrame. The sensor
+    schemas only have per-value checks, so each row gets the result it would
+    get alone; rows that fail are validated again on their own to build
+    exactly the error report a single message gets.
+    """
+    try:
+        SCHEMA_VALIDATORS.get(topic, Sensor3Schema.validate)(rows_to_frame([data for _, data in rows]), lazy=True)
+        failed_rows = ()
+    except SchemaErrors as e:
+        row_index = e.failure_cases["index"]
+        # Failures without a row (a missing or extra column, a wrong column
+        # dtype) hit every row, since they all share a shape
+        failed_rows = range(len(rows)) if row_index.isna().any() else set(row_index)
+
+    for i, (payload, data) in enumerate(rows):
+        if i in failed_rows:
+            validate_one(topic, payload, data, client)
+        else:
+            publish_valid(topic, payload, data, client)
+
+def flush_batches(client: mqtt.Client):
+    global _batches
+    with _batch_lock:
+        if not _batches:
+            return
+        batches, _batches = _batches, {}
+    for key, rows in batches.items():
+        validate_batch(key[0], rows, client)
+
+def batch_flusher(client: mqtt.Client):
+    while True:
+        time.sleep(BATCH_FLUSH_INTERVAL)
+        try:
+            flush_batches(client)
+        except Exception as e:
+            print(f"[Subscriber] Batch validation failed: {e}")
+
+def process_message(topic: str, payload: bytes, client: mqtt.Client):
+
+    # orjson reads the payload bytes directly. Unlike json it refuses NaN
+    # literals and reads integers beyond 64 bits as floats, so whatever it
+    # parses can be written back by dumps_clean.
+    try:
+        data = orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        print(f"[ERROR] Could not decode JSON from {topic}")
+        return
+    fast_validate = FAST_VALIDATORS.get(topic)
+    if fast_validate is not None:
+        if fast_validate(data):
+            publish_valid(topic, payload, data, client)
+        else:
+            # Rejected messages are nearly always invalid, and those are
+            # validated alone anyway (for their own error report)
+            validate_one(topic, payload, data, client)
+        return
+    if type(data) is not dict:
+        validate_one(topic, payload, data, client)
+        return
+
+    # Batched by shape (keys and value types), so pandas infers the same
+    # column dtypes for the batch as for each message alone
+    key = (topic, tuple(data), tuple(map(type, data.values())))
+    with _batch_lock:
+        rows = _batches.setdefault(key, [])
+        rows.append((payload, data))
+        if len(rows) < BATCH_MAX_ROWS:
+            return
+        del _batches[key]
+    validate_batch(topic, rows, client)
 
 def on_connect(client, userdata, flags, rc, props):
     print(f"[Subscriber] Connected with result code {rc}")
@@ -83,7 +185,7 @@ def on_connect(client, userdata, flags, rc, props):
 
 def on_message(client, userdata, msg):
     
-    process_message(msg.topic, msg.payload.decode(), client)
+    process_message(msg.topic, msg.payload, client)
 
 def main():
     client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
@@ -91,6 +193,7 @@ def main():
     client.on_message = on_message
 
     client.connect(BROKER, PORT)
+    threading.Thread(target=batch_flusher, args=(client,), daemon=True).start()
     client.loop_forever()
 
 if __name__ == "__main__":
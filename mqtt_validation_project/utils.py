@@ -1,8 +1,58 @@
 # utils.py
 
 import json
+import operator
+import re
 from pandera.errors import SchemaErrors
 
+# Each handler takes (column, check, failed_value) and returns the
+# (column, reason, failed_value, error_type) reported for the failure case.
+def _extra_field(column, check, failed_value):
+    # Extra field error: The column name is in 'failure_case'.
+    column = failed_value
+    reason = f"An extra field named '{column}' was found, which is not defined in the schema."
+    return column, reason, "N/A (Extra Field)", "extra_field"
+
+def _missing_field(column, check, failed_value):
+    # Missing field error: The column name is in 'failure_case'.
+    column = failed_value
+    reason = f"The required field '{column}' was not found in the data (missing)."
+    return column, reason, "N/A (Missing Field)", "missing_field"
+
+def _null_value(column, check, failed_value):
+    return column, f"The required field '{column}' cannot be null.", failed_value, "null_value"
+
+def _wrong_type(column, check, failed_value):
+    expected_type = check.split("'")[1] if "'" in check else check
+    actual_type = type(failed_value).__name__ if failed_value is not None else "None"
+    reason = f"The data type of field '{column}' is incorrect. Expected: '{expected_type}', Got: '{actual_type}'."
+    return column, reason, failed_value, "wrong_type"
+
+def _out_of_range(column, check, failed_value):
+    reason = f"The value '{failed_value}' in field '{column}' is outside the expected range. Rule: {check}"
+    return column, reason, failed_value, "out_of_range"
+
+def _mismatched_id(column, check, failed_value):
+    reason = f"The value '{failed_value}' in field '{column}' is different from the expected value. Rule: {check}"
+    return column, reason, failed_value, "mismatched_id"
+
+def _bad_format(column, check, failed_value):
+    reason = f"The value '{failed_value}' in field '{column}' does not match the expected format. Rule: {check}"
+    return column, reason, failed_value, "bad_format"
+
+# Handler per check name, i.e. the check string up to its arguments
+# ('dtype' for "dtype('float64')")
+_DISPATCH = {
+    "column_in_schema": _extra_field,
+    "column_in_dataframe": _missing_field,
+    "not_nullable": _null_value,
+    "dtype": _wrong_type,
+    "between": _out_of_range,
+    "greater_than_or_equal_to": _out_of_range,
+    "equal_to": _mismatched_id,
+    "str_matches": _bad_format,
+}
+
 def parse_pandera_errors(exc: SchemaErrors) -> list:
     """
     Converts errors from a Pandera SchemaErrors exception into a clear and reliable format
@@ -12,52 +62,20 @@ def parse_pandera_errors(exc: SchemaErrors) -> list:
     parsed_errors = []
     
     # exc.failure_cases is a DataFrame containing structured information about the errors.
-    for _, row in exc.failure_cases.iterrows():
-        column = row.get("column")
-        check = row.get("check")
-        failed_value = row.get("failure_case")
+    # Only three columns are read, so walk them as plain tuples rather than
+    # building a Series per row with iterrows()
+    failure_cases = exc.failure_cases[["column", "check", "failure_case"]]
+    for column, check, failed_value in failure_cases.itertuples(index=False, name=None):
         
-        # Default values for error messages
-        reason = f"The value '{failed_value}' in field '{column}' violated the rule: {check}"
-        output_failed_value = failed_value
-        error_type = "unknown" # Default error type
-
         # Create a specific and clear description for each error type
-        if check == "column_in_schema":
-            # Extra field error: The column name is in 'failure_case'.
-            column = failed_value
-            reason = f"An extra field named '{column}' was found, which is not defined in the schema."
-            output_failed_value = "N/A (Extra Field)"
-            error_type = "extra_field"
-        
-        elif check == "column_in_dataframe":
-            # Missing field error: The column name is in 'failure_case'.
-            column = failed_value
-            reason = f"The required field '{column}' was not found in the data (missing)."
-            output_failed_value = "N/A (Missing Field)"
-            error_type = "missing_field"
-
-        elif check and check.startswith("not_nullable"):
-            reason = f"The required field '{column}' cannot be null."
-            error_type = "null_value"
-        
-        elif check and check.startswith("dtype"):
-            expected_type = check.split("'")[1] if "'" in check else check
-            actual_type = type(failed_value).__name__ if failed_value is not None else "None"
-            reason = f"The data type of field '{column}' is incorrect. Expected: '{expected_type}', Got: '{actual_type}'."
-            error_type = "wrong_type"
-        
-        elif check and (check.startswith("between") or check.startswith("greater_than_or_equal_to")):
-            reason = f"The value '{failed_value}' in field '{column}' is outside the expected range. Rule: {check}"
-            error_type = "out_of_range"
-        
-        elif check and check.startswith("equal_to"):
-            reason = f"The value '{failed_value}' in field '{column}' is different from the expected value. Rule: {check}"
-            error_type = "mismatched_id"
-        
-        elif check and check.startswith("str_matches"):
-            reason = f"The value '{failed_value}' in field '{column}' does not match the expected format. Rule: {check}"
-            error_type = "bad_format"
+        handler = _DISPATCH.get(check.split("(", 1)[0]) if isinstance(check, str) else None
+        if handler is not None:
+            column, reason, output_failed_value, error_type = handler(column, check, failed_value)
+        else:
+            # Default values for error messages
+            reason = f"The value '{failed_value}' in field '{column}' violated the rule: {check}"
+            output_failed_value = failed_value
+            error_type = "unknown" # Default error type
 
         parsed_errors.append({
             "column": column,
@@ -68,3 +86,83 @@ def parse_pandera_errors(exc: SchemaErrors) -> list:
         })
 
     return parsed_errors
+
+# --- Fast validation of single messages ---
+_FAST_DTYPE_TYPES = {"str": (str,), "float64": (float, int)}
+_FAST_COMPARE_CHECKS = {
+    "greater_than": ("min_value", operator.gt),
+    "greater_than_or_equal_to": ("min_value", operator.ge),
+    "less_than": ("max_value", operator.lt),
+    "less_than_or_equal_to": ("max_value", operator.le),
+}
+_INT64_MIN, _INT64_MAX = -2**63, 2**63 - 1
+
+def _fast_check(check, dtype_name):
+    """
+    Turns a Pandera check into a function that takes one value and returns
+    True when it passes, or None if the fast validator doesn't support it.
+    """
+    name, stats = check.name, check.statistics
+    if name == "equal_to":
+        value = stats.get("value")
+        return (lambda v: v == value) if type(value) in (str, int, float) else None
+    if name == "str_matches" and dtype_name == "str":
+        # pandas' str.match anchors at the start like re.match
+        match = re.compile(stats.get("pattern")).match
+        return lambda v: match(v) is not None
+    if dtype_name != "float64":
+        return None
+    if name == "in_range":
+        low, high = stats.get("min_value"), stats.get("max_value")
+        low_ok = operator.ge if stats.get("include_min", True) else operator.gt
+        high_ok = operator.le if stats.get("include_max", True) else operator.lt
+        return lambda v: low_ok(v, low) and high_ok(v, high)
+    if name in _FAST_COMPARE_CHECKS:
+        key, compare = _FAST_COMPARE_CHECKS[name]
+        bound = stats.get(key)
+        return lambda v: compare(v, bound)
+    return None
+
+def compile_fast_validator(schema):
+    """
+    Compiles a coercing, strict DataFrameSchema into a function that checks a
+    parsed message dict directly, without building a DataFrame. It returns
+    True only when Pandera would accept the message; False means "let Pandera
+    decide" (and build the error report). Returns None if the schema uses
+    anything it doesn't cover.
+    """
+    if schema.strict is not True or schema.ordered or schema.index is not None or schema.checks:
+        return None
+
+    columns = []
+    for col_name, column in schema.columns.items():
+        dtype_name = str(column.dtype)
+        if dtype_name not in _FAST_DTYPE_TYPES or column.regex or not column.required:
+            return None
+        if dtype_name == "float64" and not (column.coerce or schema.coerce):
+            return None # ints are only accepted because they are coerced to floats
+        checks = []
+        for check in column.checks:
+            passes = _fast_check(check, dtype_name)
+            if passes is None:
+                return None
+            checks.append(passes)
+        columns.append((col_name, _FAST_DTYPE_TYPES[dtype_name], tuple(checks)))
+    n_columns = len(columns)
+
+    def validate(data):
+        if type(data) is not dict or len(data) != n_columns:
+            return False
+        for col_name, types, checks in columns:
+            v = data.get(col_name)
+            # Missing values, nulls, NaNs and ints pandas can't hold are left to Pandera
+            if v is None or v != v or type(v) not in types:
+                return False
+            if type(v) is int and not _INT64_MIN <= v <= _INT64_MAX:
+                return False
+            for passes in checks:
+                if not passes(v):
+                    return False
+        return True
+
+    return validate